@@ -3,14 +3,16 @@
 # sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
 # import pysqlite3 as sqlite3
 import streamlit as st
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 import time
-import tiktoken
 from PyPDF2 import PdfReader
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'gethire-mvp')))
+from utils.embedding_cache import get_embedding_cache
+from utils.clients import get_client
+from utils.llm_limits import call_llm
+from utils.tokens import count_tokens, estimate_tokens
 
 
 # Setup
@@ -18,25 +20,31 @@ load_dotenv()
 token = os.getenv("GITHUB_API_TOKEN")
 endpoint = "https://models.inference.ai.azure.com"
 
-client = OpenAI(base_url=endpoint, api_key=token)
+persist_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_persist_email_rag")
 
-embedding_model = OpenAIEmbeddings(
-    model="text-embedding-3-large",
-    openai_api_key=token,
-    openai_api_base=endpoint
-)
 
-# Load prebuilt vectorstore
-persist_dir = "chroma_persist_email_rag"
-vectorstore = Chroma(
-    persist_directory=persist_dir,
-    embedding_function=embedding_model,
-    collection_name="email_rag"
-)
+# Clients and the prebuilt vectorstore are opened once per process (shared by every
+# session and rerun) and only when first needed, not on each script execution.
+def get_llm_client():
+    return get_client('openai', token, base_url=endpoint)
 
-def count_tokens(text, encoding_name="o200k_base"):
-    enc = tiktoken.get_encoding(encoding_name)
-    return len(enc.encode(text))
+
+def get_embedding_model():
+    return get_client('embeddings', token, base_url=endpoint, model="text-embedding-3-large")
+
+
+@st.cache_resource(show_spinner=False)
+def get_vectorstore():
+    start = time.perf_counter()
+    from langchain_chroma import Chroma  # heavy import, deferred to the first query
+    vectorstore = Chroma(
+        persist_directory=persist_dir,
+        embedding_function=get_embedding_model(),
+        collection_name="email_rag"
+    )
+    open_ms = (time.perf_counter() - start) * 1000
+    print(f"Chroma vectorstore opened in {open_ms:.0f} ms")
+    return vectorstore, open_ms
 
 
 def extract_text_from_pdf(file_path):
@@ -61,7 +69,9 @@ if generate and query:
         progress_bar = st.progress(15, text="Extracting resume...")
         resume_text = extract_text_from_pdf(resume)
         progress_bar.progress(34, text="Summarizing resume...")
-        resume_response = client.chat.completions.create(
+        resume_response = call_llm(
+            'github', "gpt-4o-mini", get_llm_client().chat.completions.create,
+            tokens=estimate_tokens(resume_text) + 1000,
             model="gpt-4o-mini",
             messages=[
             {"role": "system", "content": "you would summarize the resume or cv doc provided and summarize based on the context of doc"},
@@ -76,7 +86,12 @@ if generate and query:
         st.success("Resume summarized successfully!")
     final_prompt = f"{query} - {persona}"
     with st.spinner("Retrieving relevant context...", show_time=True):
-        results = vectorstore.similarity_search_with_score(final_prompt, k=2)
+        vectorstore, open_ms = get_vectorstore()
+        final_prompt_embedding = get_embedding_cache().embed_query(
+            "text-embedding-3-large", final_prompt,
+            lambda text: call_llm('embeddings', "text-embedding-3-large", get_embedding_model().embed_query, text))
+        results = vectorstore.similarity_search_by_vector_with_relevance_scores(final_prompt_embedding, k=2)
+    st.caption(f"Vector store open time (first query in this process): {open_ms:.0f} ms")
     st.success(f"Context retrieved..............")
     retrieved = [doc.page_content for doc, _ in results]
     retrieved_metadata = [doc.metadata for doc, _ in results]
@@ -99,7 +114,9 @@ if generate and query:
     User's Resume summary: {resume_summary}
     """
     with st.spinner("Generating email...", show_time=True):
-        response = client.chat.completions.create(
+        response = call_llm(
+            'github', "gpt-4o", get_llm_client().chat.completions.create,
+            tokens=estimate_tokens(llm_prompt) + 1000,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an expert email writing assistant, using the provided external context for personalized email generation."},
@@ -1,13 +1,16 @@
 import os
 from dotenv import load_dotenv, find_dotenv
 import time
-import tiktoken
 from PyPDF2 import PdfReader
 import pinecone
 import streamlit as st
 from pinecone import Pinecone, ServerlessSpec
 from openai import OpenAI
 from langchain_openai import OpenAIEmbeddings
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'gethire-mvp')))
+from utils.embedding_cache import get_embedding_cache
+from utils.tokens import count_tokens
 
 
 # Setup
@@ -38,10 +41,6 @@ def extract_text_from_pdf(file_path):
     return text.strip()
 
 
-def count_tokens(text, encoding_name="o200k_base"):
-    enc = tiktoken.get_encoding(encoding_name)
-    return len(enc.encode(text))
-
 # Streamlit UI
 st.title("📬 Email Assistant (RAG Powered)")
 
@@ -71,7 +70,8 @@ if generate and query:
         progress_bar.progress(100, text="Resume summarized successfully!")
         st.success("Resume summarized successfully!")
     final_query = f"{query} - {persona}"
-    final_query_embedding = embedding_model.embed_query(final_query)
+    final_query_embedding = get_embedding_cache().embed_query("text-embedding-3-large", final_query,
+                                                              embedding_model.embed_query)
     with st.spinner("Retrieving relevant context...", show_time=True):
         searchresults = index.query(namespace="email_guide",
                                     vector= final_query_embedding,
@@ -0,0 +1,171 @@
+"""
+Incremental ingestion of the email guide PDFs into the RAG vector stores.
+
+Splits every PDF in a folder the same way as pinecone_init.ipynb /
+chroma_init_dev.ipynb (CharacterTextSplitter, chunk_size 2000, overlap 50,
+section = file name). Each chunk's ID is derived from its section and a hash of
+its text, so re-running after the guide changes only embeds and upserts new or
+edited chunks, and (unless --no-prune) deletes chunks that no longer exist.
+
+    python ingest.py ./email_rag_guide --backend pinecone   # index 'email', namespace 'email_guide'
+    python ingest.py ./email_rag_guide --backend chroma     # chroma_persist_email_rag, collection 'email_rag'
+    python ingest.py ./email_rag_guide --backend local      # gethire-mvp local vector index
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import os
+import sys
+import time
+from dotenv import load_dotenv
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'gethire-mvp')))
+from utils.clients import get_client
+from utils.llm_limits import call_llm
+from utils.tokens import count_tokens_batch
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 50
+EMBED_BATCH = 64
+UPSERT_BATCH = 100
+
+
+def chunk_id(section, text):
+    return f"{section}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+def load_chunks(pdf_folder, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """{chunk id: {'text', 'section'}} for every PDF in pdf_folder; identical chunks collapse to one ID."""
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import CharacterTextSplitter
+    splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, separator="\n")
+    chunks = {}
+    for filename in sorted(os.listdir(pdf_folder)):
+        if not filename.endswith(".pdf"):
+            continue
+        section = filename.split('.')[0]
+        for doc in splitter.split_documents(PyPDFLoader(file_path=os.path.join(pdf_folder, filename)).load()):
+            chunks[chunk_id(section, doc.page_content)] = {'text': doc.page_content, 'section': section}
+    return chunks
+
+
+def embed_chunks(texts, embedding_model):
+    """Embeds texts EMBED_BATCH per request through the shared rate limiter."""
+    vectors = []
+    for i in range(0, len(texts), EMBED_BATCH):
+        batch = texts[i:i + EMBED_BATCH]
+        vectors.extend(call_llm('embeddings', EMBEDDING_MODEL, embedding_model.embed_documents, batch,
+                                tokens=sum(count_tokens_batch(batch))))
+    return vectors
+
+
+class PineconeBackend:
+    def __init__(self, api_key, index_name='email', namespace='email_guide'):
+        self.index = get_client('pinecone_index', api_key, name=index_name)
+        self.namespace = namespace
+
+    def existing_ids(self):
+        return {vid for page in self.index.list(namespace=self.namespace) for vid in page}
+
+    def upsert(self, ids, vectors, chunks):
+        self.index.upsert(vectors=[{'id': i, 'values': v, 'metadata': dict(chunks[i])} for i, v in zip(ids, vectors)],
+                          namespace=self.namespace)
+
+    def delete(self, ids):
+        self.index.delete(ids=ids, namespace=self.namespace)
+
+    def finish(self):
+        pass
+
+
+class ChromaBackend:
+    def __init__(self, persist_dir, collection='email_rag'):
+        import chromadb
+        self.collection = chromadb.PersistentClient(path=persist_dir).get_or_create_collection(collection)
+
+    def existing_ids(self):
+        return set(self.collection.get(include=[])['ids'])
+
+    def upsert(self, ids, vectors, chunks):
+        self.collection.upsert(ids=ids, embeddings=vectors, documents=[chunks[i]['text'] for i in ids],
+                               metadatas=[{'section': chunks[i]['section']} for i in ids])
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def finish(self):
+        pass
+
+
+class LocalBackend:
+    """The local index is one matrix per namespace, so changes are collected and the namespace is rewritten once."""
+
+    def __init__(self, root, namespace='email_guide'):
+        from utils.vector_index import LocalVectorIndex
+        self.directory = os.path.join(root, namespace)
+        self.rows = {}
+        if os.path.exists(os.path.join(self.directory, 'info.json')):
+            ns = LocalVectorIndex(root)._namespace(namespace)
+            self.rows = {vid: (list(ns.vectors[i]), ns.metadata[i]) for i, vid in enumerate(ns.ids)}
+
+    def existing_ids(self):
+        return set(self.rows)
+
+    def upsert(self, ids, vectors, chunks):
+        for i, v in zip(ids, vectors):
+            self.rows[i] = (v, dict(chunks[i]))
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+
+    def finish(self):
+        from utils.vector_index import write_namespace
+        ids = sorted(self.rows)
+        write_namespace(self.directory, ids, [self.rows[i][0] for i in ids], [self.rows[i][1] for i in ids])
+
+
+def ingest(chunks, backend, embedding_model, prune=True, workers=4):
+    """Embeds and upserts only chunks the backend does not have; returns counts of each kind."""
+    existing = backend.existing_ids()
+    new_ids = sorted(set(chunks) - existing)
+    stale_ids = sorted(existing - set(chunks)) if prune else []
+    vectors = embed_chunks([chunks[i]['text'] for i in new_ids], embedding_model)
+    batches = [(new_ids[i:i + UPSERT_BATCH], vectors[i:i + UPSERT_BATCH]) for i in range(0, len(new_ids), UPSERT_BATCH)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda batch: backend.upsert(batch[0], batch[1], chunks), batches))
+    if stale_ids:
+        for i in range(0, len(stale_ids), UPSERT_BATCH):
+            backend.delete(stale_ids[i:i + UPSERT_BATCH])
+    backend.finish()
+    return {'chunks': len(chunks), 'unchanged': len(chunks) - len(new_ids), 'embedded': len(new_ids),
+            'deleted': len(stale_ids)}
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Incrementally index the email guide PDFs")
+    parser.add_argument('pdf_folder')
+    parser.add_argument('--backend', choices=['pinecone', 'chroma', 'local'], default='pinecone')
+    parser.add_argument('--index', default='email', help="Pinecone index name")
+    parser.add_argument('--namespace', default='email_guide')
+    parser.add_argument('--chroma-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chroma_persist_email_rag'))
+    parser.add_argument('--collection', default='email_rag')
+    parser.add_argument('--local-dir', default=None, help="local index root (default: EMAIL_GUIDE_INDEX_DIR)")
+    parser.add_argument('--no-prune', action='store_true', help="keep chunks that are no longer in the PDFs")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    token = os.getenv("GITHUB_API_TOKEN")
+    embedding_model = get_client('embeddings', token, model=EMBEDDING_MODEL)
+    if args.backend == 'pinecone':
+        backend = PineconeBackend(os.getenv("PINECONE_API_KEY"), args.index, args.namespace)
+    elif args.backend == 'chroma':
+        backend = ChromaBackend(args.chroma_dir, args.collection)
+    else:
+        from utils.vector_index import EMAIL_GUIDE_INDEX_DIR
+        backend = LocalBackend(args.local_dir or EMAIL_GUIDE_INDEX_DIR, args.namespace)
+
+    start = time.perf_counter()
+    result = ingest(load_chunks(args.pdf_folder), backend, embedding_model, prune=not args.no_prune, workers=args.workers)
+    print(f"{args.backend}: {result} in {time.perf_counter() - start:.1f}s")
@@ -1,20 +1,26 @@
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
-from langchain_openai import OpenAIEmbeddings
-from pinecone import Pinecone
 from utils.doc_extract import extract_text_from_file, count_tokens
+from utils.llm_limits import call_llm
+from utils.tokens import estimate_tokens
+from utils.clients import get_client
+from utils.embedding_cache import get_embedding_cache
+from utils.vector_index import EMAIL_RETRIEVAL_BACKEND, get_local_index
+
+def email_guide_index(pinecone_api_key):
+    """Email guide index for the configured EMAIL_RETRIEVAL_BACKEND: the local copy or the Pinecone 'email' index."""
+    if EMAIL_RETRIEVAL_BACKEND == 'local':
+        return get_local_index()
+    return get_client('pinecone_index', pinecone_api_key, name='email')
+
 
 def knowledge_retrieval(pinecone_api_key, openai_api_key, final_query):
-    pc = Pinecone(api_key=pinecone_api_key)
-    index = pc.Index(name='email')
-    index.describe_index_stats()
-    embedding_model = OpenAIEmbeddings(
-        model="text-embedding-3-large",
-        openai_api_key=openai_api_key,
-        openai_api_base="https://models.inference.ai.azure.com"
-    )
-    final_query_embedding = embedding_model.embed_query(final_query)
+    # Embed + query only; index stats are kept fresh off the request path by utils.index_stats
+    index = email_guide_index(pinecone_api_key)
+    embedding_model = get_client('embeddings', openai_api_key, model="text-embedding-3-large")
+    final_query_embedding = get_embedding_cache().embed_query(
+        "text-embedding-3-large", final_query,
+        lambda text: call_llm('embeddings', "text-embedding-3-large", embedding_model.embed_query, text))
     searchresults = index.query(namespace="email_guide",
                                vector=final_query_embedding,
                                top_k=2,
@@ -46,8 +52,10 @@ def emailwriter_main_feature(
 User's Resume text: {resume_text}
 job details: {job_details}
 """
-    client = OpenAI(base_url="https://models.github.ai/inference", api_key=openai_api_key)
-    response = client.chat.completions.create(
+    client = get_client('openai', openai_api_key)
+    response = call_llm(
+        'github', openai_model, client.chat.completions.create,
+        tokens=estimate_tokens(llm_prompt) + 1000,
         model=openai_model,
         messages=[
             {"role": "system", "content": "You are an expert email writing assistant, using the provided external context for personalized email generation."},
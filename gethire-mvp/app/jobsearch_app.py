@@ -1,18 +1,49 @@
 import streamlit as st
-import time
 import sys
 import os
-import tempfile
-import pandas as pd
 from dotenv import load_dotenv, find_dotenv
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from backend.linkedinsearch import search_linkedin_jobs
+from backend.linkedinsearch import iter_linkedin_jobs
+from backend.job_embeddings import openai_embedder, get_job_embedding_index
+from utils.resume_store import get_resume_store
 
 
 load_dotenv()
 
 
-def jobsearch_main_feature(gemini_api_key, gemini_model, resume_upload, job_titles, locations, experience_level, date_posted, easy_apply, under_10_applicants, match_score_threshold):
+def render_job_card(row):
+    with st.container(border=True):
+        col1_job, col2_job = st.columns([3, 1])
+        with col1_job:
+            st.subheader(f"{row['Job_title']}")
+            st.write(f"🏢 {row['Job_company']} | 📍 {row['Job_location']}")
+            st.write(f"**Type:** {row['Job_Type']} | **Posted:** {row['Post_date']}")
+            if row['Post_link'] and row['Post_link'] != "N/A":
+                st.link_button("Apply Now 🔗", row['Post_link'], type="secondary")
+            st.markdown(f"**Description:** {row['Job_description'][:300]}{'...' if len(row['Job_description']) > 300 else ''}")
+        with col2_job:
+            st.metric("Resume Match", f"{row['score']}%")
+            st.caption(f"Match Summary: {row['match_summary']}")
+        with st.expander("🔍 Show Gemini AI Analysis", expanded=False):
+            st.markdown(f"**JD Experience:** {row['JD_exp']}")
+            st.markdown(f"**Candidate Experience:** {row['candidate_exp']}")
+            st.markdown("**Strengths:**")
+            for s in row['strengths']:
+                st.write(f"- {s}")
+            st.markdown("**Drawbacks:**")
+            for d in row['drawbacks']:
+                st.write(f"- {d}")
+            st.markdown("**Priority Needs:**")
+            for p in row['priority_needs']:
+                st.write(f"- {p}")
+            st.markdown(f"**Domain:** {row['domain']}")
+            st.markdown(f"**Sponsorship:** {row['sponsorship']}")
+            st.session_state["job_title"] = row['Job_title']
+            st.session_state["job_company"] = row['Job_company']
+            st.session_state["job_description"] = row['Job_description'][:500]
+
+
+def jobsearch_main_feature(gemini_api_key, gemini_model, resume_upload, job_titles, locations, experience_level, date_posted, easy_apply, under_10_applicants, match_score_threshold, max_matches=0):
     # Prepare lists and codes
     jobtitles_list = [item.strip() for item in job_titles.split(',') if item.strip()] if job_titles else []
     location_list = [item.strip() for item in locations.split(',') if item.strip()] if locations else []
@@ -43,31 +74,35 @@ def jobsearch_main_feature(gemini_api_key, gemini_model, resume_upload, job_titl
     print("Date Posted: ", date_posted)
     print("Under 10 Applicants: ", under_10_applicants)
     print("Easy Apply: ", easy_apply)
+    print("Max Matches: ", max_matches)
     print("---------------------------")
 
     # --- Run job search logic directly ---
     st.markdown("---")
-    with st.spinner("Searching...", show_time=True):
-        time.sleep(2)
-        st.write(f"Job Titles: {job_titles},  Locations: {locations}")
-        time.sleep(1)
-        st.write(f"Experience: {experience_level},   Posted: {date_posted}")
-        st.write(f"Easy Apply: {easy_apply},   Under 10 Applicants: {under_10_applicants}")
-        if resume_upload:
-            st.success(f"Using resume: {resume_upload.name}")
+    st.write(f"Job Titles: {job_titles},  Locations: {locations}")
+    st.write(f"Experience: {experience_level},   Posted: {date_posted}")
+    st.write(f"Easy Apply: {easy_apply},   Under 10 Applicants: {under_10_applicants}")
+    if resume_upload:
+        st.success(f"Using resume: {resume_upload.name}")
 
-        st.markdown("---")
-        # --- Call LinkedIn job search and display results ---
-        # Only proceed if all required fields are present
-        if job_titles and locations and experience_level and date_posted and resume_upload and gemini_api_key:
-            st.info("Processing your resume...")
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_resume:
-                tmp_resume.write(resume_upload.read())
-                resume_path = tmp_resume.name
-            st.info("Hang on!! Job search extraction, filtering, and analysis in progress...")
-            st.warning("This may take 1-2 minutes depending on level of elements selected")
-            st.markdown("---")
-            df = search_linkedin_jobs(
+    st.markdown("---")
+    # --- Call LinkedIn job search and display results as they are scored ---
+    # Only proceed if all required fields are present
+    if job_titles and locations and experience_level and date_posted and resume_upload and gemini_api_key:
+        # One on-disk copy per distinct resume, removed by the store once unused (RESUME_FILE_TTL)
+        resume_store = get_resume_store()
+        resume_digest = resume_store.add_upload(resume_upload)
+        resume_path = resume_store.file_path(resume_digest)
+        counter = st.empty()
+        results = st.container()
+        kept = 0
+        error = None
+        shown = set()
+        # With an OpenAI key, JDs and the resume also go into the local embedding index
+        openai_api_key = st.session_state.get("openai_api_key")
+        embedder = openai_embedder(openai_api_key) if openai_api_key else None
+        with st.spinner("Hang on!! Job search extraction, filtering, and analysis in progress...", show_time=True):
+            for event in iter_linkedin_jobs(
                 jobtitles_list,
                 location_list,
                 experience_level_codes,
@@ -75,44 +110,42 @@ def jobsearch_main_feature(gemini_api_key, gemini_model, resume_upload, job_titl
                 gemini_api_key,
                 gemini_model,
                 resume_path,
-                match_score_threshold
-            )
+                match_score_threshold,
+                easy_apply=easy_apply,
+                under_10_applicants=under_10_applicants,
+                max_matches=max_matches or None,  # 0: first result page only
+                embedder=embedder
+            ):
+                progress = event['progress']
+                kept = progress['kept']
+                counter.info(f"Fetched: {progress['fetched']}  |  Scored: {progress['scored']}  |  Kept: {kept}")
+                if event['job'] is not None:
+                    shown.add(event['job']['Post_link'])
+                    with results:
+                        render_job_card(event['job'])
+                if event.get('done'):
+                    error = event['stats'].get('error')
+                    dropped = event['stats'].get('prefilter', {}).get('dropped', {})
+                    if any(dropped.values()):
+                        st.caption("Skipped before scoring: " + ", ".join(f"{name}: {n}" for name, n in dropped.items()))
 
-            if isinstance(df, pd.DataFrame) and not df.empty:
-                st.success(f" Found {len(df)} jobs matching your criteria.")
-                for idx, row in df.iterrows():
-                    with st.container(border=True):
-                        col1_job, col2_job = st.columns([3, 1])
-                        with col1_job:
-                            st.subheader(f"{row['Job_title']}")
-                            st.write(f"🏢 {row['Job_company']} | 📍 {row['Job_location']}")
-                            st.write(f"**Type:** {row['Job_Type']} | **Posted:** {row['Post_date']}")
-                            if row['Post_link'] and row['Post_link'] != "N/A":
-                                st.link_button("Apply Now 🔗", row['Post_link'], type="secondary")
-                            st.markdown(f"**Description:** {row['Job_description'][:300]}{'...' if len(row['Job_description']) > 300 else ''}")
-                        with col2_job:
-                            st.metric("Resume Match", f"{row['score']}%")
-                            st.caption(f"Match Summary: {row['match_summary']}")
-                        with st.expander("🔍 Show Gemini AI Analysis", expanded=False):
-                            st.markdown(f"**JD Experience:** {row['JD_exp']}")
-                            st.markdown(f"**Candidate Experience:** {row['candidate_exp']}")
-                            st.markdown("**Strengths:**")
-                            for s in row['strengths']:
-                                st.write(f"- {s}")
-                            st.markdown("**Drawbacks:**")
-                            for d in row['drawbacks']:
-                                st.write(f"- {d}")
-                            st.markdown("**Priority Needs:**")
-                            for p in row['priority_needs']:
-                                st.write(f"- {p}")
-                            st.markdown(f"**Domain:** {row['domain']}")
-                            st.markdown(f"**Sponsorship:** {row['sponsorship']}")
-                            st.session_state["job_title"] = row['Job_title']
-                            st.session_state["job_company"] = row['Job_company']
-                            st.session_state["job_description"] = row['Job_description'][:500]
-            else:
-                with st.container(border=True):
-                    st.warning("No jobs found matching the criteria.")
-                    st.write("Please try different search parameters or check your resume file.")
+        if error:
+            st.error(f"Job search failed before scoring could start (check your Gemini API key, model and resume file): {error}")
+        elif kept:
+            st.success(f" Found {kept} jobs matching your criteria.")
         else:
-            st.warning("Please fill all required fields and upload your resume.")
\ No newline at end of file
+            with st.container(border=True):
+                st.warning("No jobs found matching the criteria.")
+                st.write("Please try different search parameters or check your resume file.")
+        if embedder:
+            index = get_job_embedding_index()
+            resume_vector = index.resume_vector(resume_digest)
+            similar = [m for m in index.rank(resume_vector, k=10 + len(shown)) if m[2].get('link') not in shown][:10] \
+                if resume_vector is not None else []
+            if similar:
+                with st.expander("📚 Similar postings from earlier searches", expanded=False):
+                    for job_id, similarity, meta in similar:
+                        st.markdown(f"- [{meta.get('title')} — {meta.get('company')}]({meta.get('link')}) "
+                                    f"(similarity {similarity:.2f})")
+    else:
+        st.warning("Please fill all required fields and upload your resume.")
@@ -7,9 +7,13 @@ from dotenv import load_dotenv
 import streamlit as st
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utils.model_validation import gemini_api_validation, openai_api_validation
-from utils.doc_extract import extract_text_from_file
+from utils.resume_store import get_resume_store
+from utils.clients import warm_up
+from utils.index_stats import get_index_monitor
+from utils.embedding_cache import get_embedding_cache
 from app.jobsearch_app import jobsearch_main_feature
-from app.email_writer_app import emailwriter_main_feature
+from app.email_writer_app import emailwriter_main_feature, email_guide_index
+from utils.vector_index import EMAIL_RETRIEVAL_BACKEND
 from app.resume_enhance_app import (structured_skills, StructuredResume, skills_rating_suggestions,resume_enhance)
 
 # Add after the existing imports at the top
@@ -38,6 +42,8 @@ def init_session_state():
         st.session_state.resume_file_name = None
     if 'resume_text' not in st.session_state:
         st.session_state.resume_text = None
+    if 'resume_digest' not in st.session_state:
+        st.session_state.resume_digest = None
     if 'job_search_inputs' not in st.session_state:
         st.session_state.job_search_inputs = {}
     if 'email_inputs' not in st.session_state:
@@ -102,6 +108,17 @@ def render_landing_page():
                 st.session_state["openai_model"] = openai_model
                 st.session_state["gemini_model"] = gemini_model
                 st.session_state["api_validated"] = True
+                # Build the shared clients now so the first job search / email does not pay for it
+                try:
+                    warm_up(openai_api_key=openai_key, gemini_api_key=gemini_key,
+                            pinecone_api_key=st.secrets.get("PINECONE_API_KEY"), pinecone_index='email')
+                    if EMAIL_RETRIEVAL_BACKEND == 'local':
+                        # Load the local email guide once so the first email does not read it from disk
+                        email_guide_index(None).query(vector=[0.0] * 3072, top_k=1, namespace="email_guide")
+                    else:
+                        get_index_monitor(st.secrets["PINECONE_API_KEY"], 'email')
+                except Exception as e:
+                    print("????ERROR???? in client warm-up:", e)
     if st.session_state.get("api_validated"):    
         if st.button("Launch", icon='🚀', use_container_width=True):    
             st.session_state.page = 'main'
@@ -123,13 +140,14 @@ def render_resume_uploader(key_suffix=""):
                 st.session_state.resume_file = None
                 st.session_state.resume_file_name = None
                 st.session_state.resume_text = None
+                st.session_state.resume_digest = None
                 st.rerun()
     
     # File uploader (only show if no resume is uploaded)
     if st.session_state.resume_file is None:
         uploaded_file = st.file_uploader(
             "📄 Upload your resume (will be shared across all features)",
-            type=["pdf"],
+            type=["pdf", "docx", "txt", "md"],
             help="Limit 32MB per file. This resume will be automatically available in Job Search, Email Writer, and Resume Enhancer.",
             key=f"global_resume_uploader_{key_suffix}"
         )
@@ -139,7 +157,9 @@ def render_resume_uploader(key_suffix=""):
             st.session_state.resume_file = uploaded_file
             st.session_state.resume_file_name = uploaded_file.name
             try:
-                st.session_state.resume_text = extract_text_from_file(uploaded_file)
+                # Same bytes as an earlier upload (any session) -> text comes from the resume store
+                st.session_state.resume_digest = get_resume_store().add_upload(uploaded_file)
+                st.session_state.resume_text = get_resume_store().text(st.session_state.resume_digest)
                 st.success(f"✅ Resume uploaded successfully: **{uploaded_file.name}**")
                 st.info("🔄 This resume is now available across all features!")
                 st.rerun()
@@ -148,6 +168,7 @@ def render_resume_uploader(key_suffix=""):
                 st.session_state.resume_file = None
                 st.session_state.resume_file_name = None
                 st.session_state.resume_text = None
+                st.session_state.resume_digest = None
     
     return st.session_state.resume_file
 
@@ -157,7 +178,9 @@ def get_resume_extract():
         return st.session_state.resume_text
     elif st.session_state.resume_file is not None:
         try:
-            resume_text = extract_text_from_file(st.session_state.resume_file)
+            if st.session_state.resume_digest is None:
+                st.session_state.resume_digest = get_resume_store().add_upload(st.session_state.resume_file)
+            resume_text = get_resume_store().text(st.session_state.resume_digest)
             st.session_state.resume_text = resume_text  # Cache it
             return resume_text
         except Exception as e:
@@ -186,8 +209,11 @@ def render_sidebar():
 def render_job_search_page():
     st.header("🔍 Job Search")
     # Use centralized resume uploader
-    uploaded_resume_file = st.file_uploader("Drag and drop file here",type=["pdf"],help="Limit 32MB per file.PDF",key="resume_jobsearch_uploader")
+    uploaded_resume_file = st.file_uploader("Drag and drop file here",type=["pdf", "docx", "txt", "md"],help="Limit 32MB per file. PDF, DOCX, TXT or Markdown",key="resume_jobsearch_uploader")
     if uploaded_resume_file is not None:
+        if uploaded_resume_file is not st.session_state.resume_file:
+            st.session_state.resume_digest = get_resume_store().add_upload(uploaded_resume_file)
+            st.session_state.resume_text = None
         st.session_state.resume_file = uploaded_resume_file
         st.session_state.resume_file_name = uploaded_resume_file.name
         st.write(f"Uploaded: {uploaded_resume_file.name} ({uploaded_resume_file.size / 1024 / 1024:.2f} MB)")
@@ -219,6 +245,9 @@ def render_job_search_page():
     with col6:
         under_10_applicants = st.toggle("Under 10 Applicants", value=prev_inputs.get("under_10_applicants", False), key="under_10_form_toggle")
     match_score_threshold = st.slider("Minimum Match Score", min_value=0, max_value=100, value=prev_inputs.get("match_score_threshold", 44))
+    max_matches = st.number_input("Stop after this many matches", min_value=0, max_value=200, step=5,
+        value=prev_inputs.get("max_matches", 0), key="max_matches_input",
+        help="Walks up to 3 result pages per title/location until this many jobs clear the match score. 0 searches the first page only")
 
     if st.button("Search for Jobs", key="search_jobs_btn"):
         st.session_state.job_search_inputs = {
@@ -228,7 +257,8 @@ def render_job_search_page():
             'date_posted': date_posted,
             'easy_apply': easy_apply,
             'under_10_applicants': under_10_applicants,
-            'match_score_threshold': match_score_threshold
+            'match_score_threshold': match_score_threshold,
+            'max_matches': max_matches
         }
         #st.success("Job search submitted!")
         jobsearch_main_feature(
@@ -241,7 +271,8 @@ def render_job_search_page():
             date_posted,
             easy_apply,
             under_10_applicants,
-            match_score_threshold
+            match_score_threshold,
+            max_matches
         )
 # --- Email Writer Page ---
 def render_email_writer_page():
@@ -260,6 +291,15 @@ def render_email_writer_page():
         with col2:
             tone = st.selectbox("Tone of Email", ['Professional', 'Enthusiastic', 'Formal', 'Casual'], index=['Professional', 'Enthusiastic', 'Formal', 'Casual'].index(prev_email_inputs.get("tone", "Professional")), key="tone_input")
         job_details = st.text_input("Job Details(optional)", placeholder="e.g., job title, company name, job description", value="", key="job_details_input")
+    try:
+        if EMAIL_RETRIEVAL_BACKEND == 'local':
+            health = dict(email_guide_index(None).describe_index_stats(), index='local')
+        else:
+            health = get_index_monitor(st.secrets["PINECONE_API_KEY"], 'email').health()
+        with st.expander("Email guide index status", expanded=False):
+            st.json(dict(health, query_embedding_cache=get_embedding_cache().stats()))
+    except Exception as e:
+        print("????ERROR???? in index status:", e)
     if st.button("Generate Email", key="generate_email_btn"):
         if not resume_file:
             st.error("Please upload your resume first.")
@@ -304,11 +344,13 @@ def render_resume_enhancer_page():
 
     if resume_file:
         # Call the skills rating and suggestions UI
-        skills_rating_suggestions(openai_api_key, openai_model, temp, tokens, structured_output, resume_text)
+        skills_rating_suggestions(openai_api_key, openai_model, temp, tokens, structured_output, resume_text,
+                                  resume_digest=st.session_state.resume_digest)
         ai_suggestions = st.session_state.get('init_suggestion', {}).get('resume_init_suggestions')
         # Use the human_input value from session state (set inside the container)
         human_input = st.session_state.get('_human_input_temp', "")
-        resume_enhance(openai_api_key, "openai/gpt-4o", human_input, temp, 1500, StructuredResume, resume_text, ai_suggestions)
+        resume_enhance(openai_api_key, "openai/gpt-4o", human_input, temp, 1500, StructuredResume, resume_text, ai_suggestions,
+                       resume_digest=st.session_state.resume_digest)
 
 # --- Main Page Controller ---
 if st.session_state.page == 'landing':
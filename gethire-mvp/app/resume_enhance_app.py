@@ -1,10 +1,14 @@
 import os
 import json
 from dotenv import load_dotenv
-from openai import OpenAI
 from pydantic import BaseModel
 import streamlit as st
 from utils.doc_extract import extract_text_from_file,count_tokens
+from utils.llm_limits import call_llm
+from utils.tokens import estimate_tokens
+from utils.clients import get_client
+from utils.llm_cache import get_llm_cache
+from utils.cache_dir import template_version, text_digest
 
 
 
@@ -24,45 +28,60 @@ class StructuredResume(BaseModel):
 
 
 def llm_call(openai_api_key,openai_model,system_instruction,user_prompt,temp,tokens,structured_output):
-    client = OpenAI(base_url="https://models.github.ai/inference", api_key=openai_api_key)
+    client = get_client('openai', openai_api_key)
     messages = [
         {"role": "system", "content": system_instruction},
         {"role": "user", "content": user_prompt},
     ]
-    response = client.beta.chat.completions.parse(
+    response = call_llm(
+        'github', openai_model, client.beta.chat.completions.parse,
         model=openai_model,
         messages=messages,
         temperature=temp,
         max_tokens=tokens,
-        response_format=structured_output 
+        response_format=structured_output,
+        tokens=estimate_tokens(system_instruction + user_prompt) + tokens
     )
     llm_response = response.choices[0].message.content
     return llm_response  # Return as string, not parsed
 
 
-@st.cache_data(show_spinner=True)
-def get_skills_from_resume(openai_api_key,openai_model,temp,tokens,structured_output, resume_text):
-    system_instruction = (
-        "You are a resume analysis expert. When given a resume document, analyze it to provide: "
-        "1. Suggestive Changes: 3-4 specific, actionable improvements to enhance the resume's impact. "
-        "2. Top 5 Skills: The most relevant technical and professional skills. "
-    )
-    user_prompt = f"Analyze the resume get the suggestions and top skills.\n\n{resume_text}"
-    skills_extract = llm_call(openai_api_key,openai_model,system_instruction,user_prompt,temp,tokens,structured_output)
-    return json.loads(skills_extract)
+SKILLS_SYSTEM_INSTRUCTION = (
+    "You are a resume analysis expert. When given a resume document, analyze it to provide: "
+    "1. Suggestive Changes: 3-4 specific, actionable improvements to enhance the resume's impact. "
+    "2. Top 5 Skills: The most relevant technical and professional skills. "
+)
+SKILLS_USER_PROMPT = "Analyze the resume get the suggestions and top skills.\n\n{resume_text}"
+WRITER_SYSTEM_INSTRUCTION = (
+    "you are a resume writer and you will write a resume based on the external input suchas skillrating, suggestions, human input suggestions(if any), actual resume text "
+)
 
 
-def write_resume(openai_api_key,openai_model,final_prompt,temp,tokens,structured_output):
-    system_instruction = (
-        "you are a resume writer and you will write a resume based on the external input suchas skillrating, suggestions, human input suggestions(if any), actual resume text "
-    )
+def get_skills_from_resume(openai_api_key,openai_model,temp,tokens,structured_output, resume_text, resume_digest=None):
+    # Persistent across restarts; keyed by the resume digest rather than the full text (LLMResponseCache)
+    template = template_version(SKILLS_SYSTEM_INSTRUCTION, SKILLS_USER_PROMPT, structured_output.model_json_schema())
+    user_prompt = SKILLS_USER_PROMPT.format(resume_text=resume_text)
+    return get_llm_cache().cached_call(
+        template, openai_model, temp, tokens, resume_digest or text_digest(resume_text),
+        lambda: json.loads(llm_call(openai_api_key,openai_model,SKILLS_SYSTEM_INSTRUCTION,user_prompt,temp,tokens,structured_output)))
+
+
+def write_resume(openai_api_key,openai_model,final_prompt,temp,tokens,structured_output, resume_digest=None):
+    template = template_version(WRITER_SYSTEM_INSTRUCTION, structured_output.model_json_schema())
     user_prompt = f"{final_prompt}"
-    resume_rewrite = llm_call(openai_api_key,openai_model,system_instruction,user_prompt,temp,tokens,structured_output)
-    return json.loads(resume_rewrite)
+    return get_llm_cache().cached_call(
+        template, openai_model, temp, tokens, resume_digest or text_digest(final_prompt),
+        lambda: json.loads(llm_call(openai_api_key,openai_model,WRITER_SYSTEM_INSTRUCTION,user_prompt,temp,tokens,structured_output)),
+        inputs=user_prompt)
 
 # ---------------
-def skills_rating_suggestions(openai_api_key,openai_model,temp,tokens,structured_output, resume_text):
-    skills_rate = get_skills_from_resume(openai_api_key,openai_model,temp,tokens,structured_output, resume_text)
+def skills_rating_suggestions(openai_api_key,openai_model,temp,tokens,structured_output, resume_text, resume_digest=None):
+    resume_digest = resume_digest or text_digest(resume_text)
+    with st.spinner("Analyzing resume..."):
+        skills_rate = get_skills_from_resume(openai_api_key,openai_model,temp,tokens,structured_output, resume_text, resume_digest)
+    if st.button("🔄 Re-analyze resume"):
+        get_llm_cache().invalidate(resume_digest=resume_digest)
+        st.rerun()
     # Store AI suggestions in session state for later use
     st.session_state['init_suggestion'] = {'resume_init_suggestions': skills_rate['resume_init_suggestions']}
     slider_keys = []
@@ -96,7 +115,7 @@ def skills_rating_suggestions(openai_api_key,openai_model,temp,tokens,structured
             st.session_state["_human_input_temp"] = human_input
 
 
-def resume_enhance(openai_api_key,openai_model,human_input,temp,tokens,structured_output, resume_text, ai_suggestions):
+def resume_enhance(openai_api_key,openai_model,human_input,temp,tokens,structured_output, resume_text, ai_suggestions, resume_digest=None):
     if "result_str" in st.session_state:
         if st.button("Generate Resume"):
             if human_input.strip():
@@ -112,8 +131,9 @@ def resume_enhance(openai_api_key,openai_model,human_input,temp,tokens,structure
                 the Actual resume_text_extract: {resume_text}"""
             with st.spinner("Generating resume...", show_time=True):
                 st.caption("Input tokens: " + str(count_tokens(writer_prompt)))
-                generated_resume = write_resume(openai_api_key,openai_model,writer_prompt,temp,tokens,structured_output)
+                generated_resume = write_resume(openai_api_key,openai_model,writer_prompt,temp,tokens,structured_output, resume_digest)
             st.success("Resume generated successfully!")
+            st.caption(f"LLM response cache hit rate: {get_llm_cache().stats()['hit_rate']:.0%}")
             st.subheader("Generated Resume")
             with st.container(border=True):
                 for key, value in generated_resume.items():
@@ -0,0 +1,56 @@
+import asyncio
+import importlib.util
+import urllib.parse
+import httpx
+from utils.rate_limit import TokenBucket
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to keep-alive HTTP/1.1 without it
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class AsyncFetcher:
+    """
+    Pooled keep-alive HTTP client shared by every request of a search.
+    Caps in-flight requests per host (connections over HTTP/1.1, streams over
+    HTTP/2) and optionally rate limits each host with its own token bucket.
+    """
+
+    def __init__(self, per_host_limit=6, host_rates=None, max_connections=32, timeout=20.0, http2=True):
+        self.per_host_limit = per_host_limit
+        self.host_rates = host_rates or {}   # {host: (rate, burst)}
+        self._host_slots = {}
+        self._host_buckets = {}
+        self.client = httpx.AsyncClient(
+            http2=http2 and HTTP2_AVAILABLE,
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def _host_limits(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+            rate, burst = self.host_rates.get(host, (None, 1))
+            self._host_buckets[host] = TokenBucket(rate, burst)
+        return self._host_slots[host], self._host_buckets[host]
+
+    async def get(self, url, **kwargs):
+        """GETs url and returns the body bytes; raises httpx.HTTPStatusError on 4xx/5xx."""
+        slots, bucket = self._host_limits(url)
+        await bucket.acquire_async()
+        async with slots:
+            response = await self.client.get(url, **kwargs)
+        response.raise_for_status()
+        return response.content
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
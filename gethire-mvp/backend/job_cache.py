@@ -0,0 +1,125 @@
+import json
+import sqlite3
+import threading
+import time
+from utils.cache_dir import cache_path, open_sqlite, process_wide
+
+
+class JobPageCache:
+    """
+    SQLite cache of the fields parsed from LinkedIn job pages (description,
+    criteria, salary, applicants, hiring person), keyed by canonical job ID.
+
+    - Entries expire after `ttl` seconds.
+    - The fields that change while a posting is live (applicant count and the
+      "2 hours ago" caption) have their own, shorter `applicants_ttl`: a posting
+      whose details are fresh but whose live fields are stale only needs those re-read.
+    - When stored details exceed `max_bytes`, least recently used entries are evicted.
+    Shared across searches, users and (via WAL mode) app processes.
+    """
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, applicants_ttl=6 * 3600, max_bytes=200 * 1024 * 1024):
+        self.path = path or cache_path('job_pages.sqlite3')
+        self.ttl = ttl
+        self.applicants_ttl = applicants_ttl
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.applicant_refreshes = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(self.path, """
+            CREATE TABLE IF NOT EXISTS job_pages (
+                job_id TEXT PRIMARY KEY,
+                details TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                applicants TEXT,
+                applicants_at REAL,
+                last_access REAL NOT NULL,
+                time_ago TEXT
+            )""")
+        try:
+            self._conn.execute("ALTER TABLE job_pages ADD COLUMN time_ago TEXT")  # caches from before time_ago was split out
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_pages_lru ON job_pages(last_access)")
+
+    def get(self, job_id):
+        """
+        Returns (details, applicants_fresh). details is None on a miss or expired
+        entry; when applicants_fresh is False the caller should refresh the live
+        fields with update_volatile() before trusting details['app_count'] and
+        details['time_ago'].
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT details, fetched_at, applicants, applicants_at, time_ago FROM job_pages WHERE job_id = ?",
+                (job_id,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None, False
+            self._conn.execute("UPDATE job_pages SET last_access = ? WHERE job_id = ?", (now, job_id))
+            self.hits += 1
+        details = json.loads(row[0])
+        details['app_count'] = row[2]
+        details['time_ago'] = row[4] or "N/A"
+        return details, now - row[3] <= self.applicants_ttl
+
+    def put(self, job_id, details):
+        now = time.time()
+        payload = json.dumps({k: v for k, v in details.items() if k not in ('app_count', 'time_ago')})
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, payload, len(payload), now, details.get('app_count', "N/A"), now, now,
+                 details.get('time_ago', "N/A")))
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._evict()
+
+    def update_volatile(self, job_id, app_count, time_ago):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_pages SET applicants = ?, time_ago = ?, applicants_at = ?, last_access = ? WHERE job_id = ?",
+                (app_count, time_ago, now, now, job_id))
+            self.applicant_refreshes += 1
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM job_pages WHERE fetched_at < ?", (time.time() - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM job_pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until back under 90% of the budget
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        stale = []
+        cursor = self._conn.execute("SELECT job_id, size FROM job_pages ORDER BY last_access")
+        for job_id, size in cursor:
+            stale.append((job_id,))
+            freed += size
+            if freed >= excess:
+                break
+        cursor.close()
+        self._conn.executemany("DELETE FROM job_pages WHERE job_id = ?", stale)
+
+    def descriptions(self, limit=1000):
+        """Descriptions of the `limit` most recently used cached postings (e.g. a PreRanker corpus)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT details FROM job_pages ORDER BY last_access DESC LIMIT ?", (limit,)).fetchall()
+        descriptions = (json.loads(row[0]).get('description') for row in rows)
+        return [d for d in descriptions if d and d != "N/A"]
+
+    def evict(self):
+        with self._lock:
+            self._evict()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'applicant_refreshes': self.applicant_refreshes}
+
+
+@process_wide
+def get_job_page_cache():
+    """Process-wide JobPageCache, opened on first use."""
+    return JobPageCache()
@@ -0,0 +1,53 @@
+import re
+import urllib.parse
+
+# /jobs/view/data-engineer-at-acme-4012345678 or /jobs/view/4012345678
+_VIEW_ID = re.compile(r'/jobs/view/(?:[^/?#]*?-)?(\d+)/?$')
+
+
+def extract_job_id(url):
+    """
+    Canonical LinkedIn job ID for a `base-card__full-link` URL, so the same
+    posting reached through different searches (different slugs, refId and
+    trackingId query params, subdomains) maps to one key. Falls back to the
+    scheme-less URL without query/fragment when no numeric ID is present.
+    """
+    if not url or url == "N/A":
+        return None
+    parts = urllib.parse.urlsplit(url)
+    match = _VIEW_ID.search(parts.path)
+    if match:
+        return match.group(1)
+    query = urllib.parse.parse_qs(parts.query)
+    for param in ('currentJobId', 'jobId'):
+        if query.get(param, [''])[0].isdigit():
+            return query[param][0]
+    host = 'linkedin.com' if parts.netloc.endswith('linkedin.com') else parts.netloc
+    return (host + parts.path).rstrip('/')
+
+
+class SeenJobs:
+    """
+    Seen-set of canonical job IDs for one search. A plain set is exact and, at a
+    few thousand IDs per search, smaller than the point where a Bloom filter pays off.
+    """
+
+    def __init__(self):
+        self.ids = set()
+        self.duplicates = 0
+
+    def add(self, url):
+        """Returns True the first time a posting is seen, False for repeats."""
+        job_id = extract_job_id(url)
+        if job_id is None:
+            return True
+        if job_id in self.ids:
+            self.duplicates += 1
+            return False
+        self.ids.add(job_id)
+        return True
+
+    def report(self):
+        # Every duplicate dropped here would have cost one job-page fetch and one Gemini call
+        return {'unique': len(self.ids), 'duplicates': self.duplicates,
+                'fetches_saved': self.duplicates, 'llm_calls_saved': self.duplicates}
@@ -0,0 +1,174 @@
+import threading
+import time
+import os
+import numpy as np
+from utils.cache_dir import cache_path, open_sqlite, process_wide, text_digest
+from backend.score_cache import normalize_jd
+from utils.llm_limits import call_llm
+from utils.tokens import count_tokens_batch
+from utils.clients import get_client
+from utils.resume_store import get_resume_store
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_DIM = 3072
+EMBED_BATCH = 64
+
+
+def openai_embedder(openai_api_key, model=EMBEDDING_MODEL):
+    """embed(texts) -> list of vectors, using the same OpenAIEmbeddings endpoint as the email writer."""
+    embedding_model = get_client('embeddings', openai_api_key, model=model)
+
+    def embed(texts):
+        return call_llm('embeddings', model, embedding_model.embed_documents, texts,
+                        tokens=sum(count_tokens_batch(texts)))
+    return embed
+
+
+def _unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class JobEmbeddingIndex:
+    """
+    Local index of job description embeddings keyed by canonical job ID.
+
+    Unit vectors live in one float32 NumPy memmap (row per job, grown by
+    doubling); SQLite maps job IDs to rows and keeps the JD hash, so a posting is
+    re-embedded only when its description changes. Resume vectors live in the
+    ResumeStore, by file hash. Ranking any set of cached postings against a
+    resume or another posting is then a single matrix-vector product, with no
+    API calls.
+    """
+
+    def __init__(self, path=None, model=EMBEDDING_MODEL, dim=EMBEDDING_DIM, initial_rows=1024):
+        self.dir = path or cache_path(f'job_embeddings-{model}')
+        os.makedirs(self.dir, exist_ok=True)
+        self.model = model
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(os.path.join(self.dir, 'index.sqlite3'), """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                row INTEGER UNIQUE NOT NULL,
+                jd_hash TEXT NOT NULL,
+                title TEXT,
+                company TEXT,
+                link TEXT,
+                created_at REAL NOT NULL
+            )""")
+        self._rows = {job_id: row for job_id, row in self._conn.execute("SELECT job_id, row FROM jobs")}
+        self._vectors_path = os.path.join(self.dir, 'vectors.f32')
+        self._open(max(initial_rows, len(self._rows)))
+
+    def _open(self, rows):
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        if size < rows * row_bytes:
+            with open(self._vectors_path, 'ab') as f:
+                f.truncate(rows * row_bytes)
+            size = rows * row_bytes
+        self.capacity = size // row_bytes
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+', shape=(self.capacity, self.dim))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, job_id):
+        return job_id in self._rows
+
+    def missing(self, jobs):
+        """jobs: list of (job_id, description) -> those not indexed or whose description changed."""
+        if not jobs:
+            return []
+        with self._lock:
+            hashes = dict(self._conn.execute(
+                f"SELECT job_id, jd_hash FROM jobs WHERE job_id IN ({','.join('?' * len(jobs))})",
+                [job_id for job_id, _ in jobs]).fetchall())
+        return [(job_id, text) for job_id, text in jobs if hashes.get(job_id) != text_digest(normalize_jd(text))]
+
+    def add(self, job_id, description, vector, title=None, company=None, link=None):
+        with self._lock:
+            row = self._rows.get(job_id)
+            if row is None:
+                row = len(self._rows)
+                if row >= self.capacity:
+                    self.vectors.flush()
+                    self._open(self.capacity * 2)
+            self.vectors[row] = _unit(vector)
+            self._conn.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (job_id, row, text_digest(normalize_jd(description)), title, company, link,
+                                time.time()))
+            self._rows[job_id] = row
+
+    def ensure_jobs(self, jobs, embed):
+        """
+        jobs: list of (job_id, description, meta dict with title/company/link).
+        Embeds only postings that are new or changed, EMBED_BATCH per call. Returns the number embedded.
+        """
+        meta = {job_id: m for job_id, _, m in jobs}
+        todo = self.missing([(job_id, text) for job_id, text, _ in jobs])
+        for i in range(0, len(todo), EMBED_BATCH):
+            chunk = todo[i:i + EMBED_BATCH]
+            for (job_id, text), vector in zip(chunk, embed([text for _, text in chunk])):
+                self.add(job_id, text, vector, **meta.get(job_id, {}))
+        if todo:
+            self.vectors.flush()
+        return len(todo)
+
+    def resume_vector(self, resume_hash, resume_text=None, embed=None):
+        """Unit vector for a resume, from the shared ResumeStore; embedded once per distinct file when `embed` is given."""
+        vector = get_resume_store().embedding(resume_hash, self.model, embed, resume_text)
+        return None if vector is None else _unit(vector)
+
+    def job_vector(self, job_id):
+        row = self._rows.get(job_id)
+        return None if row is None else np.array(self.vectors[row])
+
+    def similarities(self, query_vector, job_ids):
+        """Cosine similarity of each given (indexed) job to query_vector, as {job_id: float}."""
+        known = [job_id for job_id in job_ids if job_id in self._rows]
+        if not known:
+            return {}
+        sims = self.vectors[[self._rows[job_id] for job_id in known]] @ _unit(query_vector)
+        return dict(zip(known, sims.tolist()))
+
+    def rank(self, query_vector, k=20, min_similarity=None, exclude=()):
+        """
+        Top-k indexed postings by cosine similarity to query_vector, optionally above
+        min_similarity, as [(job_id, similarity, {'title','company','link'})].
+        """
+        n = len(self._rows)
+        if n == 0:
+            return []
+        sims = self.vectors[:n] @ _unit(query_vector)
+        order = np.argsort(-sims)
+        by_row = {row: job_id for job_id, row in self._rows.items()}
+        picked = []
+        for row in order:
+            if min_similarity is not None and sims[row] < min_similarity:
+                break
+            job_id = by_row.get(int(row))
+            if job_id is None or job_id in exclude:
+                continue
+            picked.append((job_id, float(sims[row])))
+            if len(picked) >= k:
+                break
+        meta = {r[0]: {'title': r[1], 'company': r[2], 'link': r[3]} for r in self._conn.execute(
+            f"SELECT job_id, title, company, link FROM jobs WHERE job_id IN ({','.join('?' * len(picked))})",
+            [job_id for job_id, _ in picked])} if picked else {}
+        return [(job_id, sim, meta.get(job_id, {})) for job_id, sim in picked]
+
+    def more_like(self, job_id, k=10, min_similarity=None):
+        """Postings most similar to an indexed posting, excluding itself."""
+        vector = self.job_vector(job_id)
+        if vector is None:
+            return []
+        return self.rank(vector, k=k, min_similarity=min_similarity, exclude={job_id})
+
+
+@process_wide
+def get_job_embedding_index(model=EMBEDDING_MODEL):
+    """Process-wide JobEmbeddingIndex for `model`, opened on first use."""
+    return JobEmbeddingIndex(model=model)
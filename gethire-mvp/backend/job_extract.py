@@ -0,0 +1,268 @@
+"""
+Field extraction for LinkedIn search cards and job pages.
+
+The fast path parses each page once with lxml and reads every field through
+precompiled XPath selectors. When lxml is not installed the BeautifulSoup path
+(the original implementation, kept for the parity benchmark) is used instead.
+"""
+import re
+from datetime import datetime, date
+from typing import Union
+from bs4 import BeautifulSoup
+from pydantic import BaseModel
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # optional speedup; BeautifulSoup path is always available
+    lxml_html = None
+
+
+class JobCard(BaseModel):
+    """Fields read from one card of a search results page."""
+    title: str = "N/A"
+    loc: str = "N/A"
+    company: str = "N/A"
+    date_posted: Union[date, str] = "N/A"
+    link: str = "N/A"
+    company_link: str = "N/A"
+
+
+class JobDetails(BaseModel):
+    """Fields read from a job detail page."""
+    app_count: str = "N/A"  # "37", "<25" (among the first 25), ">200" (over 200) or "N/A"
+    time_ago: str = "N/A"
+    salary: str = "N/A"
+    hiring_person: str = "N/A"
+    hiring_link: str = "N/A"
+    description: str = "N/A"
+    job_level: str = "N/A"
+    job_type: str = "N/A"
+
+
+CARD_CLASS = ('base-card relative w-full hover:no-underline focus:no-underline base-card--link '
+              'base-search-card base-search-card--link job-search-card')
+_DIGITS = re.compile(r'\d+')
+_CAPTION_DIGITS = re.compile(r'\d[\d,]*')
+# Class names read by both the full parse and the volatile-field refresh, so both see the same element
+APPLICANTS_CLASS = 'num-applicants__caption'
+TIME_AGO_CLASS = 'posted-time-ago__text'
+
+
+def _class_text_re(cls):
+    """First text node of any element whose class list contains `cls`."""
+    return re.compile(r'<[a-zA-Z][^>]*\bclass="(?:[^"]*\s)?' + re.escape(cls) + r'(?:\s[^"]*)?"[^>]*>\s*([^<]*)<')
+
+
+_APPLICANTS = _class_text_re(APPLICANTS_CLASS)
+_TIME_AGO = _class_text_re(TIME_AGO_CLASS)
+
+
+def parse_applicants(caption):
+    """
+    Application_Count from the num-applicants caption. LinkedIn only shows an
+    exact number in between its bounds: "Be among the first 25 applicants" is
+    read as "<25" and "Over 200 applicants" as ">200".
+    """
+    match = _CAPTION_DIGITS.search(caption or '')
+    if not match:
+        return "N/A"
+    count = match.group().replace(',', '')
+    text = caption.lower()
+    if 'first' in text:
+        return f"<{count}"
+    if 'over' in text or 'more than' in text:
+        return f">{count}"
+    return count
+
+
+def _has_class(tag, cls):
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+
+if lxml_html is not None:
+    _CARDS = etree.XPath(f"//div[normalize-space(@class)='{CARD_CLASS}']")
+    _CARD_TITLE = etree.XPath('.//' + _has_class('h3', 'base-search-card__title'))
+    _CARD_LOC = etree.XPath('.//' + _has_class('span', 'job-search-card__location'))
+    _CARD_COMPANY = etree.XPath('.//' + _has_class('h4', 'base-search-card__subtitle'))
+    _CARD_TIME = etree.XPath('.//time')
+    _CARD_LINK = etree.XPath('.//' + _has_class('a', 'base-card__full-link'))
+    _CARD_COMPANY_LINK = etree.XPath('.//' + _has_class('a', 'hidden-nested-link'))
+    _JOB_APPLICANTS = etree.XPath('//' + _has_class('*', APPLICANTS_CLASS))
+    _JOB_TIME_AGO = etree.XPath('//' + _has_class('*', TIME_AGO_CLASS))
+    _JOB_SALARY = etree.XPath('//' + _has_class('div', 'compensation__salary-range'))
+    _JOB_HIRING = etree.XPath('//' + _has_class('div', 'base-main-card'))
+    _HIRING_NAME = etree.XPath('.//' + _has_class('span', 'sr-only'))
+    _HIRING_LINK = etree.XPath('.//a')
+    _JOB_DESCRIPTION = etree.XPath('//' + _has_class('div', 'show-more-less-html__markup'))
+    _JOB_CRITERIA = etree.XPath('//' + _has_class('li', 'description__job-criteria-item'))
+
+
+def _first_text(selector, node):
+    found = selector(node)
+    return found[0].text_content().strip() if found else "N/A"
+
+
+def _first_attr(selector, node, attr):
+    found = selector(node)
+    return found[0].get(attr, "N/A") if found else "N/A"
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return "N/A"
+
+
+def _tree(html):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    return lxml_html.fromstring(html) if html.strip() else None
+
+
+def extract_cards_lxml(html):
+    root = _tree(html)
+    if root is None:
+        return []
+    cards = []
+    for post in _CARDS(root):
+        cards.append(JobCard(
+            title=_first_text(_CARD_TITLE, post),
+            loc=_first_text(_CARD_LOC, post),
+            company=_first_text(_CARD_COMPANY, post),
+            date_posted=_parse_date(_first_attr(_CARD_TIME, post, 'datetime')),
+            link=_first_attr(_CARD_LINK, post, 'href'),
+            company_link=_first_attr(_CARD_COMPANY_LINK, post, 'href'),
+        ))
+    return cards
+
+
+def extract_job_details_lxml(html):
+    root = _tree(html)
+    if root is None:
+        return JobDetails()
+    details = JobDetails(
+        time_ago=_first_text(_JOB_TIME_AGO, root),
+        salary=_first_text(_JOB_SALARY, root),
+    )
+    applicants = _JOB_APPLICANTS(root)
+    if applicants:
+        details.app_count = parse_applicants(applicants[0].text_content())
+    hiring = _JOB_HIRING(root)
+    if hiring:
+        names, links = _HIRING_NAME(hiring[0]), _HIRING_LINK(hiring[0])
+        if names and links and links[0].get('href') is not None:
+            details.hiring_person = names[0].text_content().strip()
+            details.hiring_link = links[0].get('href')
+    description = _JOB_DESCRIPTION(root)
+    if description:
+        details.description = " ".join(t.strip() for t in description[0].itertext() if t.strip())
+    for item in _JOB_CRITERIA(root):
+        hdr, val = item.find('.//h3'), item.find('.//span')
+        if hdr is None or val is None:
+            break
+        hdr, val = hdr.text_content().strip(), val.text_content().strip()
+        if hdr == "Seniority level":
+            details.job_level = val
+        elif hdr == "Employment type":
+            details.job_type = val
+    return details
+
+
+def extract_cards_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    postings = soup.find_all('div', class_=CARD_CLASS)
+    cards = []
+    for post in postings:
+        try:
+            title = post.find('h3', class_='base-search-card__title').text.strip()
+        except:
+            title = "N/A"
+        try:
+            loc = post.find('span', class_='job-search-card__location').text.strip()
+        except:
+            loc = "N/A"
+        try:
+            company = post.find('h4', class_="base-search-card__subtitle").text.strip()
+        except:
+            company = "N/A"
+        try:
+            date_posted = datetime.strptime(post.find('time')['datetime'], '%Y-%m-%d').date()
+        except:
+            date_posted = "N/A"
+        try:
+            link = post.find('a', class_='base-card__full-link')['href']
+        except:
+            link = "N/A"
+        try:
+            company_link = post.find('a', class_='hidden-nested-link')['href']
+        except:
+            company_link = "N/A"
+        cards.append(JobCard(title=title, loc=loc, company=company, date_posted=date_posted,
+                             link=link, company_link=company_link))
+    return cards
+
+
+def extract_job_details_bs4(html):
+    soup_job = BeautifulSoup(html, 'html.parser')
+    try:
+        applicants = soup_job.find(class_=APPLICANTS_CLASS)
+        app_count = parse_applicants(applicants.text) if applicants else "N/A"
+    except:
+        app_count = "N/A"
+    try:
+        time_ago = soup_job.find(class_=TIME_AGO_CLASS).text.strip()
+    except:
+        time_ago = "N/A"
+    try:
+        salary_block = soup_job.find('div', class_='compensation__salary-range')
+        salary = salary_block.text.strip() if salary_block else "N/A"
+    except:
+        salary = "N/A"
+    try:
+        hiring_section = soup_job.find('div', class_='base-main-card')
+        hiring_person = (
+            hiring_section.find('span', class_='sr-only').text.strip()
+            if hiring_section else "N/A"
+        )
+        hiring_link = (
+            hiring_section.find('a')['href']
+            if hiring_section else "N/A"
+        )
+    except:
+        hiring_person = hiring_link = "N/A"
+    try:
+        jd_block = soup_job.find('div', class_='show-more-less-html__markup')
+        description = jd_block.get_text(separator=" ", strip=True)
+    except:
+        description = "N/A"
+
+    job_level = job_type = "N/A"
+    try:
+        criteria = soup_job.find_all('li', class_='description__job-criteria-item')
+        for item in criteria:
+            hdr = item.find('h3').text.strip()
+            val = item.find('span').text.strip()
+            if hdr == "Seniority level":
+                job_level = val
+            elif hdr == "Employment type":
+                job_type = val
+    except:
+        pass
+    return JobDetails(app_count=app_count, time_ago=time_ago, salary=salary, hiring_person=hiring_person,
+                      hiring_link=hiring_link, description=description, job_level=job_level, job_type=job_type)
+
+
+def extract_volatile_fields(html):
+    """
+    Re-reads only the fields that change while a posting is live (applicant
+    count and posted-time-ago caption) from a job page, without parsing the document.
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='ignore')
+    applicants, time_ago = _APPLICANTS.search(html), _TIME_AGO.search(html)
+    return {'app_count': parse_applicants(applicants.group(1)) if applicants else "N/A",
+            'time_ago': (time_ago.group(1).strip() or "N/A") if time_ago else "N/A"}
+
+extract_cards = extract_cards_lxml if lxml_html is not None else extract_cards_bs4
+extract_job_details = extract_job_details_lxml if lxml_html is not None else extract_job_details_bs4
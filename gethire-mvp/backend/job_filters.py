@@ -0,0 +1,82 @@
+"""
+Pre-filters applied to postings before any Gemini call.
+
+Filters LinkedIn can apply itself are pushed into the search URL so excluded
+postings are never fetched; the rest run as a FilterChain on the parsed job
+page, so a dropped posting costs one page fetch (or a cache hit) and no LLM call.
+"""
+
+
+def search_url_filters(easy_apply=False):
+    """Extra search query params for filters the guest search endpoint supports."""
+    params = {}
+    if easy_apply:
+        params['f_AL'] = 'true'
+    return params
+
+
+def applicant_range(details):
+    """
+    (low, high) bounds on Application_Count, high None when unbounded, or None
+    when the page had no count: "37" -> (37, 37), "<25" -> (0, 24), ">200" -> (201, None).
+    """
+    value = str(details.get('app_count') or '')
+    try:
+        if value.startswith('<'):
+            return 0, int(value[1:]) - 1
+        if value.startswith('>'):
+            return int(value[1:]) + 1, None
+        count = int(value)
+        return count, count
+    except ValueError:
+        return None
+
+
+def applicant_count(details):
+    """Application_Count as an int when the page showed an exact number, else None."""
+    bounds = applicant_range(details)
+    return bounds[0] if bounds and bounds[0] == bounds[1] else None
+
+
+def max_applicants(limit):
+    """
+    Check that drops postings known to have `limit` or more applicants. Postings
+    whose count may be under the limit ("<25", or no count at all) are kept.
+    """
+    def check(card, details):
+        bounds = applicant_range(details)
+        return bounds is None or bounds[0] < limit
+    return check
+
+
+class FilterChain:
+    """
+    Ordered (name, check(card, details) -> bool) filters. A posting is dropped at
+    the first failing check and counted against that filter's name.
+    """
+
+    def __init__(self, filters=()):
+        self.filters = list(filters)
+        self.dropped = {name: 0 for name, _ in self.filters}
+
+    def add(self, name, check):
+        self.filters.append((name, check))
+        self.dropped[name] = 0
+
+    def passes(self, card, details):
+        for name, check in self.filters:
+            if not check(card, details):
+                self.dropped[name] += 1
+                return False
+        return True
+
+    def report(self):
+        return dict(self.dropped)
+
+
+def build_prefilters(under_10_applicants=False):
+    """FilterChain for the job search toggles that LinkedIn cannot apply in the search URL."""
+    filters = []
+    if under_10_applicants:
+        filters.append(('under_10_applicants', max_applicants(10)))
+    return FilterChain(filters)
@@ -0,0 +1,178 @@
+import asyncio
+from utils.rate_limit import TokenBucket
+
+_DONE = object()
+
+
+class StageConfig:
+    """Worker pool size and rate limit (calls per second, None = unlimited) for one pipeline stage."""
+
+    def __init__(self, workers=1, rate=None, burst=1):
+        self.workers = workers
+        self.rate = rate
+        self.burst = burst
+
+    def __repr__(self):
+        return f"StageConfig(workers={self.workers}, rate={self.rate}, burst={self.burst})"
+
+
+class Stage:
+    """
+    One producer/consumer stage. `fn(item)` is an async generator yielding output
+    items (yield nothing to drop the item); each output is pushed to the next
+    stage's queue as soon as it is yielded. Exceptions are counted and the rest of
+    the item is dropped, so one bad posting never stalls the pipeline.
+    `flush()`, if given, is an async generator run once after the last item
+    (e.g. to release items a stage held back to rank them).
+    """
+
+    def __init__(self, name, fn, config, flush=None):
+        self.name = name
+        self.fn = fn
+        self.config = config
+        self.flush = flush
+        self.limiter = TokenBucket(config.rate, config.burst)
+        self.in_q = asyncio.Queue(maxsize=max(1, config.workers) * 4)
+        self.out_q = None
+        self.tasks = []
+        self.stats = {'in': 0, 'out': 0, 'errors': 0}
+
+    async def _work(self):
+        while True:
+            item = await self.in_q.get()
+            if item is _DONE:
+                return
+            self.stats['in'] += 1
+            await self.limiter.acquire_async()
+            try:
+                # Outputs stream downstream as they are produced (e.g. page by page)
+                async for out in self.fn(item):
+                    self.stats['out'] += 1
+                    await self.out_q.put(out)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"????ERROR???? in {self.name} stage:", e)
+
+    def start(self, out_q):
+        self.out_q = out_q
+        self.tasks = [asyncio.create_task(self._work()) for _ in range(max(1, self.config.workers))]
+
+    async def close(self):
+        for _ in self.tasks:
+            await self.in_q.put(_DONE)
+        await asyncio.gather(*self.tasks)
+        if self.flush:
+            async for out in self.flush():
+                self.stats['out'] += 1
+                await self.out_q.put(out)
+
+
+class BatchStage(Stage):
+    """
+    Stage whose `fn(batch)` takes a list of items. Each worker gathers up to
+    `batch_size` items, closing the batch early when the summed `cost(item)`
+    would pass `budget` or when no new item arrives within `linger` seconds.
+    """
+
+    def __init__(self, name, fn, config, batch_size=1, linger=1.0, cost=None, budget=None):
+        super().__init__(name, fn, config)
+        self._gather_lock = asyncio.Lock()
+        self._carry = None
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self.cost = cost or (lambda item: 0)
+        self.budget = budget
+        self.stats['batches'] = 0
+
+    async def _gather(self, first):
+        """Returns (batch, carry, done): carry is an item that did not fit the budget, done means the sentinel was read."""
+        loop = asyncio.get_running_loop()
+        if self.batch_size == 1:
+            return [first], None, False
+        batch, total = [first], self.cost(first)
+        deadline = loop.time() + self.linger
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.in_q.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _DONE:
+                return batch, None, True
+            item_cost = self.cost(item)
+            if self.budget and total + item_cost > self.budget:
+                return batch, item, False
+            batch.append(item)
+            total += item_cost
+        return batch, None, False
+
+    async def _work(self):
+        while True:
+            # One worker gathers at a time so batches fill up instead of being
+            # split across idle workers; processing happens outside the lock
+            async with self._gather_lock:
+                first = self._carry if self._carry is not None else await self.in_q.get()
+                self._carry = None
+                if first is _DONE:
+                    return
+                batch, self._carry, done = await self._gather(first)
+            self.stats['in'] += len(batch)
+            self.stats['batches'] += 1
+            await self.limiter.acquire_async()
+            try:
+                async for out in self.fn(batch):
+                    self.stats['out'] += 1
+                    await self.out_q.put(out)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"????ERROR???? in {self.name} stage:", e)
+            if done:
+                return
+
+
+async def stream_staged_pipeline(items, stages):
+    """
+    Feeds `items` through `stages` in order, each stage running its own pool of
+    worker tasks, and yields the final stage's outputs as soon as they are
+    produced. Per-stage counters stay readable on each stage's `stats`.
+    """
+    results = asyncio.Queue()
+    for i, stage in enumerate(stages):
+        stage.start(stages[i + 1].in_q if i + 1 < len(stages) else results)
+
+    async def drive():
+        for item in items:
+            await stages[0].in_q.put(item)
+        # Stages drain front to back: once a stage's workers exit, nothing more reaches the next one
+        for stage in stages:
+            await stage.close()
+        await results.put(_DONE)
+
+    driver = asyncio.create_task(drive())
+    try:
+        while True:
+            out = await results.get()
+            if out is _DONE:
+                break
+            yield out
+        await driver
+    finally:
+        # Consumer stopped early (or failed): tear the pipeline down and wait for the
+        # workers to exit, so callers can shut down the executors they submit to
+        if not driver.done():
+            tasks = [driver] + [task for stage in stages for task in stage.tasks]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_staged_pipeline(items, stages):
+    """
+    Runs stream_staged_pipeline to completion and returns the outputs of the
+    final stage (in completion order; callers sort by a key carried on the items
+    for deterministic results) with the per-stage stats as {stage name: counters}.
+    """
+    outputs = [out async for out in stream_staged_pipeline(items, stages)]
+    return outputs, {stage.name: dict(stage.stats) for stage in stages}
@@ -1,5 +1,5 @@
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timedelta
 #from selenium import webdriver
 #from selenium.webdriver.chrome.service import Service
 #from webdriver_manager.chrome import ChromeDriverManager
@@ -12,7 +12,12 @@ import warnings
 import re
 import os
 import time, json, urllib
+import asyncio
+import concurrent.futures
 import io
+import hashlib
+import threading
+import queue
 from pydantic import BaseModel
 from IPython.display import *
 
@@ -22,6 +27,22 @@ import google.auth
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 from openai import OpenAI
+from backend.job_pipeline import Stage, BatchStage, StageConfig, stream_staged_pipeline
+from utils.cache_dir import template_version
+from utils.rate_limit import TokenBucket
+from utils.llm_limits import call_llm, limiter_stats
+from utils.tokens import estimate_tokens
+from utils.clients import get_client, client_metrics
+from utils.resume_store import get_resume_store
+from utils.doc_extract import PDF_MIME
+from backend.http_client import AsyncFetcher
+from backend.job_filters import search_url_filters, build_prefilters
+from backend.prerank import PreRanker
+from backend.job_embeddings import get_job_embedding_index
+from backend.job_dedupe import SeenJobs, extract_job_id
+from backend.job_cache import get_job_page_cache
+from backend.job_extract import extract_cards, extract_job_details, extract_volatile_fields
+from backend.score_cache import get_score_cache
 
 # Global configuration for Gemini job evaluation
 #GEMINI_API_KEY = ""
@@ -48,6 +69,10 @@ class CandidateFit(BaseModel):
     domain: str
     sponsorship: str
 
+
+class BatchCandidateFit(CandidateFit):
+    job_id: str  # echoes the job_id header of the JD it scores, to map batch results back
+
 # prompt for Gemini model
 
 Model_instruction = """You are ResumeMatchAI — an ATS-compliant, recruiter-aware evaluator that analyzes how well a candidate's resume matches a job description. You do not write, rephrase, or improve content. Your only task is to compare and score match quality.
@@ -106,34 +131,243 @@ Field Definitions (per CandidateFit)
 
 User_prompt = "Evaluate the following resume(file attached) against the job description. Follow the system rules and return output only in the defined structured"
 
+Batch_prompt = ("Evaluate the following resume(file attached) separately against EACH job description below. "
+                "Return one CandidateFit object per job, in the same order, and copy each job's job_id exactly. "
+                "Follow the system rules and return output only in the defined structured")
+MAX_BATCH_SIZE = 12          # 500 output tokens per job must fit the model's output limit
+BATCH_TOKEN_BUDGET = 24000   # JD tokens packed into one batched request
+
+
+def jd_tokens(text):
+    """Token count used for batch budgeting; stops counting once a single JD exceeds the whole budget."""
+    return estimate_tokens(text, budget=BATCH_TOKEN_BUDGET)
+
+
+def build_batch_prompt(jobs):
+    """jobs: list of (job_id, title, company, description) -> one prompt scoring them all."""
+    blocks = [
+        f"### job_id: {job_id}\nJob Title: {title}\nCompany: {company}\nDescription: {description}"
+        for job_id, title, company, description in jobs
+    ]
+    return Batch_prompt + "\n\n" + "\n\n".join(blocks)
+
+
+def parse_batch_response(text, job_ids):
+    """
+    Validates a batched response against BatchCandidateFit and returns
+    {job_id: CandidateFit dict} for the requested ids. Raises ValueError when the
+    response is not a list or covers none of the jobs; ids it omits are simply
+    absent so the caller can score them one by one.
+    """
+    items = json.loads(text)
+    if not isinstance(items, list):
+        raise ValueError("batch response is not a list")
+    results = {}
+    for item in items:
+        try:
+            fit = BatchCandidateFit.model_validate(item)
+        except Exception:
+            continue
+        if fit.job_id in job_ids and fit.job_id not in results:
+            results[fit.job_id] = fit.model_dump(exclude={'job_id'})
+    if not results:
+        raise ValueError("batch response matched no job_id")
+    return results
+
 
 # --- Gemini Client/Job Search Functions ---
+def file_sha256(path):
+    """Returns the hex SHA-256 digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class GeminiEvaluator:
+    """
+    Evaluator session for one search: holds the Gemini client, the resume
+    (uploaded file handle, or inline PDF part) and the GenerateContentConfig,
+    so scoring a posting costs exactly one generate_content call.
+    """
+
+    def __init__(self, API_KEY, model_name, system_prompt, resume, inline_resume=False):
+        self.client = get_client('gemini', API_KEY)
+        self.model_name = model_name
+        self.resume_hash = get_resume_store().add_file(resume)
+        self.config = types.GenerateContentConfig(
+            system_instruction=system_prompt,
+            max_output_tokens=500,
+            temperature=0.3,
+            top_p=0.9,
+            response_mime_type='application/json',
+            response_schema=list[CandidateFit]
+        )
+        if get_resume_store().mime(self.resume_hash) != PDF_MIME:
+            # DOCX/TXT resumes go to Gemini as their extracted text
+            self.resume_part = types.Part.from_text(text=get_resume_store().text(self.resume_hash))
+        elif inline_resume:
+            with open(resume, 'rb') as f:
+                self.resume_part = types.Part.from_bytes(data=f.read(), mime_type='application/pdf')
+        else:
+            self.resume_part = self._uploaded_resume(API_KEY, resume)
+
+    def _uploaded_resume(self, API_KEY, resume):
+        # Uploaded once per (API key, resume digest) in this server process (ResumeStore.gemini_file)
+        return get_resume_store().gemini_file(
+            self.resume_hash, API_KEY,
+            lambda path: call_llm('gemini', self.model_name, self.client.files.upload, file=path))
+
+    def evaluate(self, final_prompt):
+        ai_response = call_llm('gemini', self.model_name, self.client.models.generate_content,
+                               model=self.model_name,
+                               contents=[self.resume_part, final_prompt],
+                               config=self.config,
+                               tokens=estimate_tokens(final_prompt) + self.config.max_output_tokens)
+        return ai_response.text
+
+    def evaluate_batch(self, batch_prompt, n_jobs):
+        """Scores n_jobs JDs packed into batch_prompt (build_batch_prompt) against the resume in one call."""
+        config = self.config.model_copy(update={
+            'max_output_tokens': 500 * n_jobs,
+            'response_schema': list[BatchCandidateFit],
+        })
+        ai_response = call_llm('gemini', self.model_name, self.client.models.generate_content,
+                               model=self.model_name,
+                               contents=[self.resume_part, batch_prompt],
+                               config=config,
+                               tokens=estimate_tokens(batch_prompt) + config.max_output_tokens)
+        return ai_response.text
+
+
 def init_gemini_client(API_KEY, model_name, system_prompt, resume, final_prompt):
     """
-    Initializes the Gemini client, uploads the resume, and returns:
-    - client: the Gemini client instance
-    - uploaded_file: the uploaded resume file reference
-    - config: the GenerateContentConfig for evaluation
+    One-shot evaluation of final_prompt against the resume. Kept for callers
+    scoring a single posting; searches should hold a GeminiEvaluator instead.
     """
-    client = genai.Client(api_key=API_KEY)
-    uploaded_file = client.files.upload(file=resume)
-    config = types.GenerateContentConfig(
-        system_instruction=system_prompt,
-        max_output_tokens=500,
-        temperature=0.3,
-        top_p=0.9,
-        response_mime_type='application/json',
-        response_schema=list[CandidateFit]
-    )
-    ai_response = client.models.generate_content(
-                        model=model_name,
-                        contents=[uploaded_file, final_prompt],
-                        config=config
-                    )
-    return ai_response.text
-
-
-def search_linkedin_jobs(
+    return GeminiEvaluator(API_KEY, model_name, system_prompt, resume).evaluate(final_prompt)
+
+
+LINKEDIN_SEARCH_URL = 'https://www.linkedin.com/jobs/search/'
+PAGE_SIZE = 25  # cards per LinkedIn search page; `start` advances by this
+FINAL_COLUMNS = [
+    'Job_title', 'Job_location', 'Job_company', 'Post_date', 'Time_posted',
+    'Post_link', 'Company_link', 'Job_description', 'Job_Level', 'Job_Type',
+    'Application_Count', 'Salary', 'Hiring_Person', 'Hiring_Person_Link',
+    'score', 'match_summary', 'JD_exp', 'candidate_exp', 'strengths',
+    'drawbacks', 'priority_needs', 'domain', 'sponsorship'
+]
+
+# Per-stage worker pools and rate limits (requests/sec). Search pages are the
+# most bot-sensitive, so they stay slow. Gemini calls are paced by the shared
+# per-model quota in utils.llm_limits, so the score stage only caps concurrency.
+DEFAULT_STAGE_CONFIG = {
+    'search': StageConfig(workers=2, rate=0.5, burst=2),
+    'job_fetch': StageConfig(workers=8, rate=5, burst=5),
+    'parse': StageConfig(workers=4),
+    'embed': StageConfig(workers=2),
+    'score': StageConfig(workers=8),
+}
+
+
+def build_search_url(job_title, location, experience_level, time_posted, start=0, search_url=LINKEDIN_SEARCH_URL,
+                     url_filters=None):
+    getVars = {
+        'keywords': job_title,
+        'location': location,
+        'sort': 'date',
+        'start': str(start),
+        'f_E': experience_level,
+        'f_TPR': time_posted,
+        **(url_filters or {})
+    }
+    return search_url + '?' + urllib.parse.urlencode(getVars)
+
+
+def posted_cutoff(time_posted, now=None):
+    """Oldest card date still inside an f_TPR window like 'r86400' (seconds), or None if unbounded."""
+    match = re.fullmatch(r'r(\d+)', time_posted or '')
+    if not match:
+        return None
+    return ((now or datetime.now()) - timedelta(seconds=int(match.group(1)))).date()
+
+
+async def paginate_search(fetcher, job_title, location, experience_level, time_posted,
+                          search_url=LINKEDIN_SEARCH_URL, max_pages=3, prefetch=1,
+                          parse=None, limiter=None, stop=None, url_filters=None):
+    """
+    Lazily walks `start` offsets of one title/location search, yielding
+    (start, cards) per page. Up to `prefetch` pages are fetched ahead of the
+    consumer. Stops after an empty page, once a page reaches cards posted before
+    the f_TPR window (results are sorted by date), after max_pages, or as soon as
+    stop() returns True (e.g. the caller's match quota is filled).
+    `parse` is an optional coroutine function html -> cards (e.g. to parse off
+    the event loop); pages are parsed inline otherwise. `url_filters` are extra
+    query params (see job_filters.search_url_filters).
+    """
+    cutoff = posted_cutoff(time_posted)
+    pending = []
+    next_page = 0
+
+    async def fetch(start):
+        if limiter:
+            await limiter.acquire_async()
+        return await fetcher.get(build_search_url(job_title, location, experience_level, time_posted, start,
+                                                  search_url, url_filters))
+
+    def schedule():
+        nonlocal next_page
+        while len(pending) <= prefetch and next_page < max_pages:
+            start = next_page * PAGE_SIZE
+            pending.append((start, asyncio.create_task(fetch(start))))
+            next_page += 1
+
+    try:
+        schedule()
+        while pending and not (stop and stop()):
+            start, task = pending.pop(0)
+            html = await task
+            cards = await parse(html) if parse else parse_search_cards(html)
+            if not cards:
+                return
+            in_window = [c for c in cards if cutoff is None or c['date_posted'] == "N/A" or c['date_posted'] >= cutoff]
+            if in_window:
+                yield start, in_window
+            if len(in_window) < len(cards):
+                return
+            schedule()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+def parse_search_cards(html):
+    """Card fields (title, location, company, date, links) from a search results page, as dicts."""
+    return [card.model_dump() for card in extract_cards(html)]
+
+
+def parse_job_page(html):
+    """Detail fields (applicants, salary, hiring person, description, criteria) from a job page, as a dict."""
+    return extract_job_details(html).model_dump()
+
+
+def has_description(details):
+    return details['description'] not in ("N/A", "")
+
+
+def build_job_row(card, details, gem_data):
+    return [
+        card['title'], card['loc'], card['company'], card['date_posted'], details['time_ago'],
+        card['link'], card['company_link'], details['description'], details['job_level'], details['job_type'],
+        details['app_count'], details['salary'], details['hiring_person'], details['hiring_link'],
+        gem_data['score'], gem_data['match_summary'], gem_data['JD_exp'],
+        gem_data['candidate_exp'], gem_data['strengths'], gem_data['drawbacks'],
+        gem_data['priority_needs'], gem_data['domain'], gem_data['sponsorship']
+    ]
+
+
+async def stream_linkedin_jobs(
     job_titles,           # list of job titles (keywords)
     locations,            # list of locations
     experience_level,     # experience filter code (e.g., '1,2')
@@ -141,154 +375,398 @@ def search_linkedin_jobs(
     Api_key,              # Gemini API key
     Model_name,           # Gemini model name
     Resume_doc,            # path to the resume file
-    match_score_threshold  # minimum match score threshold
+    match_score_threshold,  # minimum match score threshold
+    stage_config=None,     # {stage name: StageConfig} overrides for DEFAULT_STAGE_CONFIG
+    scorer=None,           # callable(final_query) -> Gemini JSON text; defaults to a GeminiEvaluator
+    search_url=LINKEDIN_SEARCH_URL,
+    fetcher=None,          # AsyncFetcher to reuse; a pooled one is opened (and closed) per search otherwise
+    max_pages=None,        # search result pages (25 cards each) per title/location; default 3 with max_matches, else 1
+    max_matches=None,      # stop paging/scoring once this many postings clear the threshold
+    job_cache=None,        # JobPageCache; None uses the process-wide cache, False disables caching
+    score_cache=None,      # ScoreCache; None uses the process-wide cache, False disables caching
+    batch_size=5,          # JDs scored per Gemini request (1 = one request per posting)
+    batch_scorer=None,     # callable(batch_prompt, n_jobs) -> JSON text; defaults to the evaluator's batch call
+    easy_apply=False,      # only Easy Apply postings (applied by LinkedIn via the search URL)
+    under_10_applicants=False,  # drop postings with 10+ applicants before scoring
+    prerank_cutoff=None,   # drop postings whose local resume/JD score (PreRanker, 0-1) is below this
+    prerank_top_k=None,    # only score the top K postings by local score (waits for all postings first)
+    score_log=None,        # JSONL path; every Gemini-scored posting is appended for benchmarks/eval_prerank.py
+    embedder=None,         # callable(texts) -> vectors (e.g. job_embeddings.openai_embedder); enables the embedding index
+    embedding_index=None   # JobEmbeddingIndex; None uses the process-wide index for the default model
 ):
     """
-    Searches LinkedIn for given job_titles and locations, evaluates each posting
-    against the uploaded resume using Gemini, and returns a pandas DataFrame of results.
-    """
-    data = []
-    total_jobs_extracted = 0
-    final_col = [
-        'Job_title', 'Job_location', 'Job_company', 'Post_date', 'Time_posted',
-        'Post_link', 'Company_link', 'Job_description', 'Job_Level', 'Job_Type',
-        'Application_Count', 'Salary', 'Hiring_Person', 'Hiring_Person_Link',
-        'score', 'match_summary', 'JD_exp', 'candidate_exp', 'strengths',
-        'drawbacks', 'priority_needs', 'domain', 'sponsorship'
-    ]
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    Searches LinkedIn for every job title x location, scores each posting against
+    the resume with Gemini and yields an event as soon as a posting is scored:
 
+        {'key': (title idx, location idx, card position), 'job': row dict or None,
+         'progress': {'fetched': n, 'scored': n, 'kept': n}}
+
+    'job' is keyed by FINAL_COLUMNS (plus 'similarity') for postings above
+    match_score_threshold and None otherwise. The last event has 'done': True
+    and the pipeline 'stats'.
+    """
     warnings.filterwarnings("ignore", category=DeprecationWarning)
-    
-    for job_title in job_titles:
-        for location in locations:
-            getVars = {
-                'keywords': job_title,
-                'location': location,
-                'sort': 'date',
-                'start': '0',
-                'f_E': experience_level,
-                'f_TPR': time_posted
-            }
-            url = 'https://www.linkedin.com/jobs/search/?' + urllib.parse.urlencode(getVars)
-            
-            time.sleep(2)
-            
-            response = requests.get(url, headers=headers, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            postings = soup.find_all(
-                'div',
-                class_='base-card relative w-full hover:no-underline '
-                      'focus:no-underline base-card--link '
-                      'base-search-card base-search-card--link job-search-card'
-            )
-
-            for post in postings:
-                total_jobs_extracted += 1
-                # Extract fields...
-                try:
-                    title = post.find('h3', class_='base-search-card__title').text.strip()
-                except:
-                    title = "N/A"
-                try:
-                    loc = post.find('span', class_='job-search-card__location').text.strip()
-                except:
-                    loc = "N/A"
-                try:
-                    company = post.find('h4', class_="base-search-card__subtitle").text.strip()
-                except:
-                    company = "N/A"
-                try:
-                    date_posted = datetime.strptime(post.find('time')['datetime'], '%Y-%m-%d').date()
-                except:
-                    date_posted = "N/A"
-                try:
-                    link = post.find('a', class_='base-card__full-link')['href']
-                except:
-                    link = "N/A"
-                try:
-                    company_link = post.find('a', class_='hidden-nested-link')['href']
-                except:
-                    company_link = "N/A"
+    stages_cfg = dict(DEFAULT_STAGE_CONFIG, **(stage_config or {}))
+    if max_pages is None:
+        # Extra pages are only worth walking when a quota can stop the search early
+        max_pages = 3 if max_matches is not None else 1
 
-                # Fetch job page
-                try:
-                    resp = requests.get(link, headers=headers)
-                    soup_job = BeautifulSoup(resp.content, 'html.parser')
-                except:
-                    continue
+    if scorer is None:
+        # One evaluator session (client, uploaded resume, config) for the whole search
+        try:
+            evaluator = await asyncio.to_thread(GeminiEvaluator, Api_key, Model_name, Model_instruction, Resume_doc)
+        except Exception as e:
+            print("????ERROR???? in Gemini resume upload:", e)
+            yield {'key': None, 'job': None, 'progress': {'fetched': 0, 'scored': 0, 'kept': 0},
+                   'done': True, 'stats': {'error': str(e)}}
+            return
+        scorer = evaluator.evaluate
+        batch_scorer = evaluator.evaluate_batch
+        resume_hash = evaluator.resume_hash
+    else:
+        resume_hash = file_sha256(Resume_doc) if Resume_doc else None
+    if score_cache is None:
+        score_cache = get_score_cache()
+    if resume_hash is None:
+        score_cache = False
+    # Batch and single calls share cache entries, so both prompts are part of the version
+    score_version = template_version(Model_instruction, User_prompt, Batch_prompt)
+    if batch_scorer is None:
+        batch_size = 1
+    batch_size = min(batch_size, MAX_BATCH_SIZE)
 
-                # Extract additional details...
-                try:
-                    applicants = soup_job.find('figcaption', class_='num-applicants__caption')
-                    app_count = re.search(r'\d+', applicants.text).group() if applicants else "N/A"
-                except:
-                    app_count = "N/A"
-                try:
-                    time_ago = soup_job.find('span', class_='posted-time-ago__text').text.strip()
-                except:
-                    time_ago = "N/A"
-                try:
-                    salary_block = soup_job.find('div', class_='compensation__salary-range')
-                    salary = salary_block.text.strip() if salary_block else "N/A"
-                except:
-                    salary = "N/A"
-                try:
-                    hiring_section = soup_job.find('div', class_='base-main-card')
-                    hiring_person = (
-                        hiring_section.find('span', class_='sr-only').text.strip()
-                        if hiring_section else "N/A"
-                    )
-                    hiring_link = (
-                        hiring_section.find('a')['href']
-                        if hiring_section else "N/A"
-                    )
-                except:
-                    hiring_person = hiring_link = "N/A"
-                try:
-                    jd_block = soup_job.find('div', class_='show-more-less-html__markup')
-                    description = jd_block.get_text(separator=" ", strip=True)
-                except:
-                    description = "N/A"
+    if job_cache is None:
+        job_cache = get_job_page_cache()
+    own_fetcher = fetcher is None
+    fetcher = fetcher or AsyncFetcher(per_host_limit=stages_cfg['job_fetch'].workers)
+    # Parsing and the (blocking) Gemini SDK run in per-stage thread pools sized to the stage's workers
+    loop = asyncio.get_running_loop()
+    parse_pool = concurrent.futures.ThreadPoolExecutor(max_workers=stages_cfg['parse'].workers)
+    score_pool = concurrent.futures.ThreadPoolExecutor(max_workers=stages_cfg['score'].workers)
+    # Embedding calls block in call_llm waiting on the embeddings quota; keep them off the parse threads
+    embed_pool = concurrent.futures.ThreadPoolExecutor(max_workers=stages_cfg['embed'].workers) if embedder else None
 
-                job_level = job_type = "N/A"
-                try:
-                    criteria = soup_job.find_all('li', class_='description__job-criteria-item')
-                    for item in criteria:
-                        hdr = item.find('h3').text.strip()
-                        val = item.find('span').text.strip()
-                        if hdr == "Seniority level":
-                            job_level = val
-                        elif hdr == "Employment type":
-                            job_type = val
-                except:
-                    pass
-
-                # Evaluate with Gemini
-                final_query = f"{User_prompt}\nJob Title: {title}\nCompany: {company}\nDescription: {description}"
+    matched = 0
+    seen = SeenJobs()
+    url_filters = search_url_filters(easy_apply)
+    prefilters = build_prefilters(under_10_applicants)
+    ranker = None
+    resume_text = None
+    if (prerank_cutoff is not None or prerank_top_k or score_log or embedder) and Resume_doc:
+        try:
+            store = get_resume_store()
+            resume_text = await asyncio.to_thread(lambda: store.text(store.add_file(Resume_doc)))
+        except Exception as e:
+            print("????ERROR???? reading resume text, local pre-ranking disabled:", e)
+    if resume_text and (prerank_cutoff is not None or prerank_top_k):
+        # IDF is fixed for the whole search (cached JDs as corpus) so scores do not depend on arrival order
+        corpus = await asyncio.to_thread(job_cache.descriptions) if job_cache else []
+        ranker = PreRanker(resume_text).fit(corpus)
+        if prerank_cutoff is not None:
+            prefilters.add('prerank_cutoff', lambda card, details: details['prerank'] >= prerank_cutoff)
+    held = []
+    resume_vector = None
+    if embedder:
+        if embedding_index is None:
+            embedding_index = get_job_embedding_index()
+        if resume_hash and resume_text:
+            try:
+                resume_vector = await asyncio.to_thread(embedding_index.resume_vector, resume_hash, resume_text, embedder)
+            except Exception as e:
+                print("????ERROR???? in resume embedding:", e)
+    batch_stats = {'batch_calls': 0, 'single_calls': 0, 'failed': 0}
+
+    def quota_filled():
+        return max_matches is not None and matched >= max_matches
+
+    async def parse_cards(html):
+        return await loop.run_in_executor(parse_pool, parse_search_cards, html)
+
+    # Rate limits apply to network/LLM calls only: search pages per page rather than
+    # per title/location item, and cache hits for job pages and scores go straight through
+    page_limiter = TokenBucket(stages_cfg['search'].rate, stages_cfg['search'].burst)
+    job_limiter = TokenBucket(stages_cfg['job_fetch'].rate, stages_cfg['job_fetch'].burst)
+    llm_limiter = TokenBucket(stages_cfg['score'].rate, stages_cfg['score'].burst)
+
+    async def fetch_search(item):
+        key, (job_title, location) = item
+        async for start, cards in paginate_search(fetcher, job_title, location, experience_level, time_posted,
+                                                  search_url, max_pages, parse=parse_cards,
+                                                  limiter=page_limiter, stop=quota_filled,
+                                                  url_filters=url_filters):
+            for idx, card in enumerate(cards):
+                # Overlapping titles/locations return the same postings; fetch and score each once
+                if seen.add(card['link']):
+                    yield (key + (start + idx,), card)
+
+    async def fetch_job(item):
+        """Fresh JobPageCache hits skip the fetch; hits with stale applicant count / posted time are refetched for those only."""
+        key, card = item
+        if card['link'] == "N/A" or quota_filled():
+            return
+        job_id = extract_job_id(card['link'])
+        cached, applicants_fresh = job_cache.get(job_id) if job_cache else (None, False)
+        if cached is not None and applicants_fresh:
+            yield (key, card, job_id, None, cached)
+            return
+        await job_limiter.acquire_async()
+        yield (key, card, job_id, await fetcher.get(card['link']), cached)
+
+    async def parse_job(item):
+        key, card, job_id, html, cached = item
+        if html is None:
+            details = cached
+        elif cached is not None:
+            volatile = extract_volatile_fields(html)
+            details = dict(cached, **volatile)
+            if job_cache:
+                job_cache.update_volatile(job_id, volatile['app_count'], volatile['time_ago'])
+        else:
+            details = await loop.run_in_executor(parse_pool, parse_job_page, html)
+            # A page without a description (authwall, throttling, changed markup) is not cached,
+            # so the next search fetches it again instead of reusing an empty JD for the whole TTL
+            if job_cache and has_description(details):
+                job_cache.put(job_id, details)
+        if ranker:
+            details = dict(details, prerank=ranker.score(details['description']))
+        # Cheap checks on the parsed page; postings dropped here never reach Gemini
+        if prefilters.passes(card, details):
+            yield (key, card, details)
+
+    async def embed_jobs(batch):
+        """Adds each JD to the JobEmbeddingIndex (once per job ID and description) and attaches its resume similarity."""
+        jobs = [(extract_job_id(card['link']), details['description'],
+                 {'title': card['title'], 'company': card['company'], 'link': card['link']})
+                for _, card, details in batch]
+        sims = {}
+        try:
+            await loop.run_in_executor(embed_pool, embedding_index.ensure_jobs, jobs, embedder)
+            if resume_vector is not None:
+                sims = embedding_index.similarities(resume_vector, [job_id for job_id, _, _ in jobs])
+        except Exception as e:
+            print("????ERROR???? in job embeddings:", e)
+        for (key, card, details), (job_id, _, _) in zip(batch, jobs):
+            yield (key, card, dict(details, similarity=sims.get(job_id)))
+
+    async def hold_job(item):
+        """Holds every posting until parsing finishes so only the top K reach Gemini; results stop streaming early."""
+        held.append(item)
+        return
+        yield
+
+    async def release_top_k():
+        # Highest local score first, search order breaking ties
+        held.sort(key=lambda item: (-item[2]['prerank'], item[0]))
+        for item in held[:prerank_top_k]:
+            yield item
+
+    def log_score(card, details, gem_data):
+        with open(score_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'job_id': extract_job_id(card['link']), 'title': card['title'],
+                                'company': card['company'], 'description': details['description'],
+                                'resume': resume_text, 'score': gem_data['score']}) + "\n")
+
+    def job_prompt(card, details):
+        return f"{User_prompt}\nJob Title: {card['title']}\nCompany: {card['company']}\nDescription: {details['description']}"
+
+    async def score_one(final_query):
+        await llm_limiter.acquire_async()
+        return json.loads(await loop.run_in_executor(score_pool, scorer, final_query))[0]
+
+    async def score_uncached(jobs):
+        """
+        jobs: list of (card, details, final_query) -> list of CandidateFit dicts (None when scoring failed).
+        Several jobs go in one batch request; the jobs a batch response misses are scored one by one.
+        """
+        results = {}
+        if len(jobs) > 1:
+            job_ids = [f"J{i}" for i in range(len(jobs))]
+            prompt = build_batch_prompt([(job_id, card['title'], card['company'], details['description'])
+                                         for job_id, (card, details, _) in zip(job_ids, jobs)])
+            try:
+                await llm_limiter.acquire_async()
+                text = await loop.run_in_executor(score_pool, batch_scorer, prompt, len(jobs))
+                results = parse_batch_response(text, set(job_ids))
+                batch_stats['batch_calls'] += 1
+            except Exception as e:
+                print("????ERROR???? in Gemini batch response, scoring jobs one by one:", e)
+            results = [results.get(job_id) for job_id in job_ids]
+        else:
+            results = [None]
+        for i, (card, details, final_query) in enumerate(jobs):
+            if results[i] is None:
+                batch_stats['single_calls'] += 1
                 try:
-                    output_text=init_gemini_client(Api_key, Model_name, Model_instruction, Resume_doc, final_query)
-                    gem_data = json.loads(output_text)[0]
+                    results[i] = await score_one(final_query)
                 except Exception as e:
-                    print("????ERROR???? in GEmini response:", e)
+                    # Retries are exhausted by now (utils.llm_limits); count the posting rather than lose it silently
+                    batch_stats['failed'] += 1
+                    print(f"????ERROR???? in GEmini response, posting not scored: {card['title']} at {card['company']}:", e)
+        return results
+
+    async def score_jobs(batch):
+        """Serves ScoreCache hits (keyed by resume, JD, model and prompt version) and scores the rest."""
+        nonlocal matched
+        if quota_filled():
+            return
+        scored, uncached = [], []
+        for key, card, details in batch:
+            final_query = job_prompt(card, details)
+            cache_key = score_cache.make_key(resume_hash, final_query, Model_name, score_version) if score_cache else None
+            gem_data = score_cache.get(cache_key) if score_cache else None
+            if gem_data is None:
+                uncached.append((key, card, details, final_query, cache_key))
+            else:
+                scored.append((key, card, details, gem_data))
+        if uncached:
+            fresh = await score_uncached([(card, details, q) for _, card, details, q, _ in uncached])
+            for (key, card, details, _, cache_key), gem_data in zip(uncached, fresh):
+                if gem_data is None:
                     continue
+                if score_cache and has_description(details):
+                    score_cache.put(cache_key, gem_data)
+                scored.append((key, card, details, gem_data))
+        for key, card, details, gem_data in scored:
+            if score_log and resume_text:
+                log_score(card, details, gem_data)
+            if gem_data['score'] > match_score_threshold and not quota_filled():
+                matched += 1
+                print(f"Added job: {card['title']} -at {card['company']} -with score {gem_data['score']} - {gem_data['match_summary']}")
+                yield (key, build_job_row(card, details, gem_data), details.get('similarity'))
+            else:
+                yield (key, None, None)  # scored but not kept: still a progress update
+
+    searches = [
+        ((t_idx, l_idx), (job_title, location))
+        for t_idx, job_title in enumerate(job_titles)
+        for l_idx, location in enumerate(locations)
+    ]
+    # Each stage runs its own worker pool and rate limit over one pooled keep-alive client
+    stages = [
+        Stage('search', fetch_search, StageConfig(workers=stages_cfg['search'].workers)),
+        Stage('job_fetch', fetch_job, StageConfig(workers=stages_cfg['job_fetch'].workers)),
+        Stage('parse', parse_job, stages_cfg['parse']),
+        *([BatchStage('embed', embed_jobs, stages_cfg['embed'], batch_size=16, linger=0.5)] if embedder else []),
+        *([Stage('prerank_top_k', hold_job, StageConfig(), flush=release_top_k)] if ranker and prerank_top_k else []),
+        BatchStage('score', score_jobs, StageConfig(workers=stages_cfg['score'].workers),
+                   batch_size=batch_size, cost=lambda item: jd_tokens(item[2]['description']),
+                   budget=BATCH_TOKEN_BUDGET),
+    ]
+    progress = {'fetched': 0, 'scored': 0, 'kept': 0}
+    pipeline = stream_staged_pipeline(searches, stages)
+    try:
+        async for key, row, similarity in pipeline:
+            progress = {'fetched': stages[1].stats['out'], 'scored': progress['scored'] + 1,
+                        'kept': progress['kept'] + (row is not None)}
+            job = dict(zip(FINAL_COLUMNS, row), similarity=similarity) if row else None
+            yield {'key': key, 'job': job, 'progress': progress}
+    finally:
+        # Stop the stage workers first; they may still be submitting to the pools below
+        await pipeline.aclose()
+        parse_pool.shutdown(wait=False)
+        score_pool.shutdown(wait=False)
+        if embed_pool:
+            embed_pool.shutdown(wait=False)
+        if own_fetcher:
+            await fetcher.aclose()
+    stats = {stage.name: dict(stage.stats) for stage in stages}
+    stats['dedupe'] = seen.report()
+    stats['prefilter'] = {'url': url_filters, 'dropped': prefilters.report()}
+    if ranker and prerank_top_k:
+        stats['prefilter']['dropped']['prerank_top_k'] = max(0, len(held) - prerank_top_k)
+    stats['llm'] = dict(batch_stats, limits=limiter_stats())
+    stats['clients'] = client_metrics()
+    if embedder:
+        stats['embeddings'] = {'indexed': len(embedding_index), 'resume_embedded': resume_vector is not None}
+    if job_cache:
+        stats['job_cache'] = job_cache.stats()
+    if score_cache:
+        stats['score_cache'] = score_cache.stats()
+    print("Pipeline stats:", stats)
+    print(f"Dedupe: skipped {seen.duplicates} duplicate postings "
+          f"({stats['dedupe']['fetches_saved']} job fetches, {stats['dedupe']['llm_calls_saved']} Gemini calls saved)")
+    yield {'key': None, 'job': None, 'progress': progress, 'done': True, 'stats': stats}
+
+
+async def async_search_linkedin_jobs(job_titles, locations, experience_level, time_posted, Api_key, Model_name,
+                                     Resume_doc, match_score_threshold, **kwargs):
+    """
+    Runs stream_linkedin_jobs to completion and returns a pandas DataFrame of the
+    kept postings, ordered by (title, location, card position) regardless of
+    completion order. Pipeline stats are in df.attrs['pipeline_stats'].
+    """
+    results, stats = [], {}
+    async for event in stream_linkedin_jobs(job_titles, locations, experience_level, time_posted, Api_key,
+                                            Model_name, Resume_doc, match_score_threshold, **kwargs):
+        if event['job'] is not None:
+            results.append((event['key'], [event['job'][col] for col in FINAL_COLUMNS]))
+        if event.get('done'):
+            stats = event['stats']
 
-                if gem_data['score'] > match_score_threshold:
-                    data.append([
-                        title, loc, company, date_posted, time_ago,
-                        link, company_link, description, job_level, job_type,
-                        app_count, salary, hiring_person, hiring_link,
-                        gem_data['score'], gem_data['match_summary'], gem_data['JD_exp'],
-                        gem_data['candidate_exp'], gem_data['strengths'], gem_data['drawbacks'],
-                        gem_data['priority_needs'], gem_data['domain'], gem_data['sponsorship']
-                    ])
-                    print(f"Added job: {title} -at {company} -with score {gem_data['score']} - {gem_data['match_summary']}")
+    data = [row for _, row in sorted(results, key=lambda r: r[0])]
     # Create DataFrame from collected data
     if data:
-        df=pd.DataFrame(data, columns=final_col)
+        df=pd.DataFrame(data, columns=FINAL_COLUMNS)
     else:
-        df = pd.DataFrame(columns=final_col)
+        df = pd.DataFrame(columns=FINAL_COLUMNS)
         print("No jobs found matching the criteria.")
+    df.attrs['pipeline_stats'] = stats
     return df
 
+
+def run_sync(coro):
+    """Runs a coroutine to completion from sync code, even when the caller already has a running loop (Jupyter)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def iter_linkedin_jobs(*args, **kwargs):
+    """
+    Sync iterator over stream_linkedin_jobs events (same arguments), for callers
+    like Streamlit that render results as they arrive. The search runs on its own
+    event loop in a background thread; closing the iterator stops it.
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+    end = object()
+
+    async def pump():
+        search = stream_linkedin_jobs(*args, **kwargs)
+        try:
+            async for event in search:
+                events.put(event)
+                if stop.is_set():
+                    break
+        except Exception as e:
+            events.put(e)
+        finally:
+            await search.aclose()
+            events.put(end)
+
+    worker = threading.Thread(target=lambda: asyncio.run(pump()), daemon=True)
+    worker.start()
+    try:
+        while True:
+            event = events.get()
+            if event is end:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+    finally:
+        stop.set()
+
+
+def search_linkedin_jobs(job_titles, locations, experience_level, time_posted, Api_key, Model_name,
+                         Resume_doc, match_score_threshold, **kwargs):
+    """Sync wrapper over async_search_linkedin_jobs; same arguments, returns the results DataFrame."""
+    return run_sync(async_search_linkedin_jobs(
+        job_titles, locations, experience_level, time_posted, Api_key, Model_name,
+        Resume_doc, match_score_threshold, **kwargs
+    ))
+
 #search_linkedin_jobs(JOB_TITLES, LOCATIONS, EXPERIENCE_FILTER, DATE_POSTED_FILTER,GEMINI_API_KEY, MODEL_NAME, RESUME_PATH)
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Local first-pass relevance score between the resume and a job description,
+used to keep obviously unrelated postings away from Gemini.
+
+The score is the TF-IDF cosine between resume and JD (sublinear tf, IDF over a
+fixed corpus of JDs given to fit() before scoring), scaled down when the JD asks
+for clearly more years of experience than the resume states. It is in [0, 1],
+does not depend on the order postings arrive in, and takes well under a
+millisecond per posting.
+"""
+import math
+import re
+from collections import Counter
+
+_WORD = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+# "3+ years", "5-7 years", "2 to 4 yrs", "10 plus years"
+_YEARS = re.compile(r'\b(\d{1,2})\s*(?:\+|plus)?\s*(?:(?:-|–|to)\s*\d{1,2}\s*\+?\s*)?(?:years?|yrs?)\b', re.I)
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+during each etc for from had has have having he her his how i if in into is it its may more most
+must of on or our out over per she should so such than that the their them then there these they
+this those through to under up us use using via was we well were what when where which while who
+will with within would you your able ability across work working team teams job role including
+""".split())
+
+
+def tokenize(text):
+    return [w for w in _WORD.findall((text or '').lower()) if w not in STOPWORDS]
+
+
+def years_required(text):
+    """Smallest years-of-experience figure mentioned in a JD, or None."""
+    years = [int(m.group(1)) for m in _YEARS.finditer(text or '') if int(m.group(1)) <= 30]
+    return min(years) if years else None
+
+
+def years_stated(text):
+    """Largest years-of-experience figure mentioned in a resume, or None."""
+    years = [int(m.group(1)) for m in _YEARS.finditer(text or '') if int(m.group(1)) <= 40]
+    return max(years) if years else None
+
+
+class PreRanker:
+    """
+    Scores JDs against one resume. IDF comes only from the corpus passed to
+    fit(); scoring never changes it, so a JD gets the same score whatever else
+    was scored before it. Without fit() every term has the same IDF (plain
+    sublinear-tf cosine). A JD asking for more than `years_slack` years beyond
+    the resume's figure has its score multiplied by `experience_penalty`.
+    """
+
+    def __init__(self, resume_text, years_slack=2, experience_penalty=0.5):
+        self.resume_tf = Counter(tokenize(resume_text))
+        self.candidate_years = years_stated(resume_text)
+        self.years_slack = years_slack
+        self.experience_penalty = experience_penalty
+        self.df = Counter()
+        self.n_docs = 0
+        self._resume_w = None
+
+    def fit(self, jd_texts):
+        """Sets document frequencies from jd_texts (replacing any earlier fit)."""
+        self.df = Counter()
+        self.n_docs = 0
+        for text in jd_texts:
+            self.df.update(set(tokenize(text)))
+            self.n_docs += 1
+        self._resume_w = None
+        return self
+
+    def _idf(self, term):
+        return math.log((1 + self.n_docs) / (1 + self.df[term])) + 1
+
+    def _weights(self, tf):
+        return {t: (1 + math.log(n)) * self._idf(t) for t, n in tf.items()}
+
+    def score(self, jd_text):
+        jd_tf = Counter(tokenize(jd_text))
+        if not jd_tf or not self.resume_tf:
+            return 0.0
+        if self._resume_w is None:
+            self._resume_w = self._weights(self.resume_tf)
+        jd_w = self._weights(jd_tf)
+        resume_w = self._resume_w
+        dot = sum(w * resume_w[t] for t, w in jd_w.items() if t in resume_w)
+        norm = math.sqrt(sum(w * w for w in jd_w.values())) * math.sqrt(sum(w * w for w in resume_w.values()))
+        similarity = dot / norm if norm else 0.0
+        required = years_required(jd_text)
+        if required is not None and self.candidate_years is not None and \
+                required > self.candidate_years + self.years_slack:
+            similarity *= self.experience_penalty
+        return round(similarity, 4)
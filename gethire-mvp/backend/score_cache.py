@@ -0,0 +1,63 @@
+import json
+import re
+import threading
+import time
+from utils.cache_dir import cache_path, open_sqlite, process_wide, text_digest
+
+
+def normalize_jd(text):
+    """Whitespace-insensitive form of a job description, so re-scraped copies hash the same."""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+class ScoreCache:
+    """
+    Persistent memo of Gemini CandidateFit results keyed by
+    (resume hash, normalized JD hash, model name, prompt version).
+    Scores do not depend on match_score_threshold or the UI filters, so
+    re-running a search with a different threshold is served from here.
+    """
+
+    def __init__(self, path=None, ttl=30 * 24 * 3600):
+        self.path = path or cache_path('match_scores.sqlite3')
+        self.ttl = ttl
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(self.path, """
+            CREATE TABLE IF NOT EXISTS match_scores (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )""")
+
+    @staticmethod
+    def make_key(resume_hash, jd_text, model_name, version):
+        return text_digest('|'.join([resume_hash, text_digest(normalize_jd(jd_text)), model_name or '', version]))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT result, created_at FROM match_scores WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO match_scores VALUES (?, ?, ?)",
+                               (key, json.dumps(result), time.time()))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM match_scores")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': round(self.hits / total, 3) if total else 0.0}
+
+
+@process_wide
+def get_score_cache():
+    """Process-wide ScoreCache, opened on first use."""
+    return ScoreCache()
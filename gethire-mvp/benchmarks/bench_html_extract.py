@@ -0,0 +1,47 @@
+"""
+Per-page parse time and peak memory of the lxml/XPath extractor vs the original
+BeautifulSoup path over the saved fixture pages in benchmarks/fixtures, and a
+parity check that both paths return the same fields. Memory is the tracemalloc
+peak, i.e. Python-heap allocations; libxml2's C-side tree is not included.
+
+    python benchmarks/bench_html_extract.py [iterations]
+"""
+import glob
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.job_extract import (extract_cards_bs4, extract_cards_lxml,
+                                 extract_job_details_bs4, extract_job_details_lxml)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def measure(fn, html, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(html)
+    per_page = (time.perf_counter() - start) / iterations
+    tracemalloc.start()
+    fn(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return per_page, peak
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'page':<26}{'bs4 ms':>9}{'lxml ms':>9}{'speedup':>9}{'bs4 MB':>9}{'lxml MB':>9}")
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.html'))):
+        with open(path, 'rb') as f:
+            html = f.read()
+        if os.path.basename(path).startswith('search'):
+            slow, fast = extract_cards_bs4, extract_cards_lxml
+        else:
+            slow, fast = extract_job_details_bs4, extract_job_details_lxml
+        assert slow(html) == fast(html), f"extractors disagree on {path}"
+        slow_t, slow_mem = measure(slow, html, iterations)
+        fast_t, fast_mem = measure(fast, html, iterations)
+        print(f"{os.path.basename(path):<26}{slow_t * 1e3:>9.2f}{fast_t * 1e3:>9.2f}{slow_t / fast_t:>8.1f}x"
+              f"{slow_mem / 2**20:>9.2f}{fast_mem / 2**20:>9.2f}")
@@ -0,0 +1,77 @@
+"""
+Resume PDF text extraction: the original loop (text += page.extract_text() per
+page) vs utils.doc_extract run sequentially and across a process pool, over
+generated text-only PDFs of increasing page count. Also checks that all three
+return the same text. The process pool only helps with more than one CPU.
+
+    python benchmarks/bench_pdf_extract.py [pages ...]
+"""
+import io
+import os
+import sys
+import time
+from PyPDF2 import PdfReader
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.doc_extract import extract_pdf_pages, join_pages
+
+LINES_PER_PAGE = 50
+WORDS = ("python kubernetes terraform data pipelines led migrated reduced latency "
+         "designed services mentored engineers shipped analytics platform").split()
+
+
+def make_pdf(n_pages):
+    """A minimal valid PDF with n_pages pages of Helvetica text, built by hand."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for p in range(n_pages):
+        lines = [" ".join(WORDS[(p + i + j) % len(WORDS)] for j in range(12)) for i in range(LINES_PER_PAGE)]
+        ops = ["BT /F1 9 Tf 11 TL 40 780 Td"] + [f"({line}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), n_pages)
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (i, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def original_extract(data):
+    """The extractor as it was before utils.doc_extract collected pages into a list."""
+    reader = PdfReader(io.BytesIO(data))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() + "\n"
+    return text.strip()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 50, 200, 500]
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'pages':>6}{'MB':>7}{'original ms':>13}{'sequential ms':>15}{'parallel ms':>13}{'workers':>9}{'slowest pg ms':>15}  same")
+    for n in sizes:
+        data = make_pdf(n)
+        old_text, old_ms = timed(lambda: original_extract(data))
+        seq, seq_ms = timed(lambda: extract_pdf_pages(data, workers=1))
+        par, par_ms = timed(lambda: extract_pdf_pages(data))
+        same = old_text == join_pages(seq['pages']) == join_pages(par['pages'])
+        print(f"{n:>6}{len(data) / 1e6:>7.1f}{old_ms:>13.0f}{seq_ms:>15.0f}{par_ms:>13.0f}{par['workers']:>9}"
+              f"{max(par['page_ms']):>15.1f}  {same}")
@@ -0,0 +1,41 @@
+"""
+End-to-end latency of search_linkedin_jobs against a local LinkedIn stand-in and
+a fake scorer: serial (one worker per stage) vs the default staged pipeline.
+
+    python benchmarks/bench_search_pipeline.py
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.linkedinsearch import search_linkedin_jobs
+from backend.job_pipeline import StageConfig
+from benchmarks.fake_linkedin import FakeLinkedIn, fake_scorer
+
+TITLES = ['Data Engineer', 'Analytics Engineer', 'Data Analyst']
+LOCATIONS = ['Texas', 'California']
+SERIAL = {name: StageConfig(workers=1) for name in ('search', 'job_fetch', 'parse', 'score')}
+CONCURRENT = {
+    'search': StageConfig(workers=4),
+    'job_fetch': StageConfig(workers=16),
+    'parse': StageConfig(workers=4),
+    'score': StageConfig(workers=32),
+}
+
+
+def run(label, stage_config, server):
+    start = time.perf_counter()
+    df = search_linkedin_jobs(TITLES, LOCATIONS, '2', 'r86400', None, None, None, 50,
+                              stage_config=stage_config, scorer=fake_scorer(0.1),
+                              search_url=server.search_url, job_cache=False)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<11} rows={len(df):<4} time={elapsed:6.2f}s")
+    return elapsed, df
+
+
+if __name__ == '__main__':
+    with FakeLinkedIn(latency=0.02, cards_per_page=10) as server:
+        serial, df_serial = run('serial', SERIAL, server)
+        concurrent, df_concurrent = run('concurrent', CONCURRENT, server)
+    assert df_serial['Post_link'].tolist() == df_concurrent['Post_link'].tolist(), "row order differs"
+    print(f"speedup: {serial / concurrent:.1f}x")
@@ -0,0 +1,88 @@
+"""
+Offline evaluation of the local pre-ranker (backend/prerank.py) against saved
+Gemini scores. For each cutoff and top-K, reports the share of postings that
+would still be sent to Gemini and the recall of the postings Gemini scored
+above --threshold, plus the pre-ranker's time per posting.
+
+Record a dataset by passing score_log='scores.jsonl' to search_linkedin_jobs
+(one line per Gemini-scored posting: description, resume text, score), then:
+
+    python benchmarks/eval_prerank.py scores.jsonl [--threshold 50] [--fit-fraction 0.5]
+
+The earliest --fit-fraction of the log only serves as the IDF corpus, the way
+the pipeline fits on JDs cached by earlier searches; the rest is evaluated
+twice, with that corpus and with none (a cold cache).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.prerank import PreRanker
+
+CUTOFFS = [0.0, 0.02, 0.05, 0.08, 0.1, 0.15, 0.2]
+TOP_K = [5, 10, 25, 50]
+
+
+def load(path):
+    """Logged records in file order (the order the pipeline scored them in)."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def prerank(records, corpus):
+    """Scores each record against its resume with IDF fitted on `corpus`, as the pipeline fits on cached JDs."""
+    scored, elapsed = [], 0.0
+    rankers = {}
+    for record in records:
+        if record['resume'] not in rankers:
+            rankers[record['resume']] = PreRanker(record['resume']).fit(corpus)
+        start = time.perf_counter()
+        local = rankers[record['resume']].score(record['description'])
+        elapsed += time.perf_counter() - start
+        scored.append((record['resume'], local, record['score']))
+    return scored, elapsed / max(1, len(scored))
+
+
+def report(label, forwarded, scored, threshold):
+    positives = sum(1 for _, _, llm in scored if llm > threshold)
+    kept = sum(1 for _, _, llm in forwarded if llm > threshold)
+    recall = kept / positives if positives else 1.0
+    print(f"{label:<14}{len(forwarded) / len(scored):>11.1%}{recall:>9.1%}")
+
+
+def evaluate(scored, threshold):
+    print(f"{'filter':<14}{'forwarded':>11}{'recall':>9}")
+    for cutoff in CUTOFFS:
+        report(f"cutoff {cutoff}", [s for s in scored if s[1] >= cutoff], scored, threshold)
+    for k in TOP_K:
+        # top_k applies per search, i.e. per resume here
+        forwarded = []
+        for resume in {s[0] for s in scored}:
+            ranked = sorted((s for s in scored if s[0] == resume), key=lambda s: -s[1])
+            forwarded.extend(ranked[:k])
+        report(f"top {k}", forwarded, scored, threshold)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('dataset')
+    parser.add_argument('--threshold', type=int, default=50, help='match_score_threshold a posting must clear')
+    parser.add_argument('--fit-fraction', type=float, default=0.5,
+                        help='share of the log (earliest first) used only as the IDF corpus, like previously cached JDs')
+    args = parser.parse_args()
+
+    records = load(args.dataset)
+    n_fit = int(len(records) * args.fit_fraction)
+    held_out = records[n_fit:]
+    if not held_out:
+        sys.exit("empty dataset")
+    positives = sum(1 for record in held_out if record['score'] > args.threshold)
+    print(f"{len(held_out)} postings evaluated, {positives} above threshold {args.threshold}")
+    # Cold cache: the pipeline has no cached JDs to fit on, so every term has the same IDF
+    for label, corpus in [("cold cache (uniform IDF)", []),
+                          (f"IDF fitted on the {n_fit} earlier logged JDs", [r['description'] for r in records[:n_fit]])]:
+        scored, per_job = prerank(held_out, corpus)
+        print(f"\n{label}, pre-rank {per_job * 1e6:.0f} us/posting")
+        evaluate(scored, args.threshold)
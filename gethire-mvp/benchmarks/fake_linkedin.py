@@ -0,0 +1,123 @@
+"""
+Local HTTP stand-in for LinkedIn's guest job pages plus a fake Gemini scorer,
+used by the benchmarks so they run offline with controllable latency.
+"""
+import json
+import re
+import threading
+import time
+import urllib.parse
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CARD_CLASS = ('base-card relative w-full hover:no-underline focus:no-underline base-card--link '
+              'base-search-card base-search-card--link job-search-card')
+
+
+def search_page_html(base, keywords, location, start=0, cards=25):
+    items = []
+    for i in range(start, start + cards):
+        job_id = abs(hash((keywords, location, i))) % 10**10
+        items.append(f"""
+<li><div class="{CARD_CLASS}">
+  <a class="base-card__full-link" href="{base}/jobs/view/{urllib.parse.quote(keywords)}-{job_id}?refId=abc&amp;trackingId=x{i}">link</a>
+  <h3 class="base-search-card__title">{keywords} {i}</h3>
+  <h4 class="base-search-card__subtitle"><a class="hidden-nested-link" href="{base}/company/c{i}">Company {i}</a></h4>
+  <span class="job-search-card__location">{location}</span>
+  <time class="job-search-card__listdate" datetime="{date.today().isoformat()}">1 day ago</time>
+</div></li>""")
+    return f"<html><body><ul class='jobs-search__results-list'>{''.join(items)}</ul></body></html>"
+
+
+def job_page_html(job_id, applicants=7):
+    description = " ".join(["Build data pipelines with Python, SQL and Airflow; 3+ years of experience."] * 40)
+    return f"""<html><body>
+<span class="posted-time-ago__text">2 hours ago</span>
+<figcaption class="num-applicants__caption">{applicants} applicants</figcaption>
+<div class="compensation__salary-range">$100,000/yr - $130,000/yr</div>
+<div class="base-main-card"><a href="https://example.com/in/recruiter{job_id}">x</a><span class="sr-only">Recruiter {job_id}</span></div>
+<div class="show-more-less-html__markup">{description}</div>
+<ul>
+<li class="description__job-criteria-item"><h3>Seniority level</h3><span>Mid-Senior level</span></li>
+<li class="description__job-criteria-item"><h3>Employment type</h3><span>Full-time</span></li>
+</ul>
+</body></html>"""
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 256
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients cancelling prefetched pages is expected
+
+
+class FakeLinkedIn:
+    """Threaded local server; every response is delayed by `latency` seconds to mimic network RTT."""
+
+    def __init__(self, latency=0.02, cards_per_page=25, pages=1):
+        self.latency = latency
+        self.cards_per_page = cards_per_page
+        self.pages = pages
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                url = urllib.parse.urlparse(self.path)
+                if url.path.startswith('/jobs/search'):
+                    q = urllib.parse.parse_qs(url.query)
+                    start = int(q.get('start', ['0'])[0])
+                    cards = server.cards_per_page if start < server.cards_per_page * server.pages else 0
+                    body = search_page_html(server.base, q.get('keywords', [''])[0], q.get('location', [''])[0], start, cards)
+                else:
+                    job_id = url.path.rsplit('-', 1)[-1]
+                    # Spread applicant counts over 0-19 so the under-10 pre-filter drops about half
+                    body = job_page_html(job_id, int(job_id) % 20 if job_id.isdigit() else 7)
+                data = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _Server(('127.0.0.1', 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.search_url = self.base + '/jobs/search/'
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _fit(score, **extra):
+    return dict({
+        'score': score, 'match_summary': 'Fake match', 'JD_exp': '3+ years', 'candidate_exp': '3 years',
+        'strengths': ['Python'], 'drawbacks': ['None'], 'priority_needs': ['SQL'],
+        'domain': 'Tech', 'sponsorship': 'Sponsorship OK'
+    }, **extra)
+
+
+def fake_scorer(latency=0.2, score=70):
+    """Returns a scorer(final_query) that sleeps like a Gemini call and returns CandidateFit JSON."""
+    def scorer(final_query):
+        time.sleep(latency)
+        return json.dumps([_fit(score)])
+    return scorer
+
+
+def fake_batch_scorer(latency=0.3, score=70):
+    """Returns a batch_scorer(batch_prompt, n_jobs) answering every `### job_id:` block in one call."""
+    def batch_scorer(batch_prompt, n_jobs):
+        time.sleep(latency)
+        return json.dumps([_fit(score, job_id=job_id) for job_id in re.findall(r'### job_id: (\S+)', batch_prompt)])
+    return batch_scorer
@@ -0,0 +1,58 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+
+# Local caches (job pages, scores, embeddings...) live here; override with GETHIRE_CACHE_DIR
+CACHE_DIR = os.environ.get("GETHIRE_CACHE_DIR") or (
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.cache'))
+)
+
+
+def cache_path(name):
+    """Path of a cache file/dir under CACHE_DIR, creating the directory if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+
+def text_digest(data):
+    """SHA-256 hex digest of a str (UTF-8) or bytes."""
+    return hashlib.sha256(data.encode('utf-8') if isinstance(data, str) else data).hexdigest()
+
+
+def template_version(*parts):
+    """Short hash of prompt template parts (texts, or JSON-serializable schemas); editing any part changes it."""
+    return text_digest('\x1f'.join(p if isinstance(p, str) else json.dumps(p, sort_keys=True) for p in parts))[:16]
+
+
+def open_sqlite(path, *schema):
+    """
+    Autocommit SQLite connection in WAL mode, shareable across threads (callers
+    serialize access with their own lock), with each `schema` statement run once.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in schema:
+        conn.execute(statement)
+    return conn
+
+
+def process_wide(factory):
+    """Decorator: one instance per distinct arguments for the whole process, built on first call."""
+    signature = inspect.signature(factory)
+    instances = {}
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.items())
+        with lock:
+            if key not in instances:
+                instances[key] = factory(*args, **kwargs)
+            return instances[key]
+    return get
@@ -0,0 +1,106 @@
+"""
+Process-wide registry of provider clients (OpenAI-compatible chat, Gemini,
+Pinecone, OpenAI embeddings), keyed by provider, base URL, a hash of the API key
+and any extra options. Each client owns an HTTP connection pool, so reusing it
+keeps connections warm across calls, Streamlit reruns and user sessions.
+
+Inside a Streamlit app the clients are held with st.cache_resource (the raw key
+is excluded from Streamlit's hashing); elsewhere a module-level dict is used.
+"""
+import hashlib
+import threading
+
+try:
+    import streamlit as st
+    from streamlit import runtime as st_runtime
+except ImportError:  # backend/benchmarks can run without Streamlit
+    st = None
+
+GITHUB_MODELS_URL = "https://models.github.ai/inference"
+AZURE_INFERENCE_URL = "https://models.inference.ai.azure.com"
+# Model the email writer and the job embedding index ask for; warm_up must use the same options key
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+_clients = {}
+_lock = threading.Lock()
+_metrics = {}
+
+
+def api_key_hash(api_key):
+    return hashlib.sha256((api_key or '').encode()).hexdigest()[:16]
+
+
+def _count(provider, field):
+    with _lock:
+        stats = _metrics.setdefault(provider, {'built': 0, 'reused': 0})
+        stats[field] += 1
+
+
+def _build(provider, api_key, base_url, options):
+    _count(provider, 'built')
+    # SDK-level retries are off: utils.llm_limits.call_llm is the only retry layer,
+    # so every attempt goes through the shared limiter and its 429 back-off
+    if provider == 'openai':
+        from openai import OpenAI
+        return OpenAI(base_url=base_url or GITHUB_MODELS_URL, api_key=api_key, max_retries=0)
+    if provider == 'gemini':
+        from google import genai
+        return genai.Client(api_key=api_key)
+    if provider == 'pinecone':
+        from pinecone import Pinecone
+        return Pinecone(api_key=api_key)
+    if provider == 'pinecone_index':
+        return get_client('pinecone', api_key).Index(name=options['name'])
+    if provider == 'embeddings':
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=options.get('model', EMBEDDING_MODEL), openai_api_key=api_key,
+                                openai_api_base=base_url or AZURE_INFERENCE_URL, max_retries=0)
+    raise ValueError(f"unknown client provider: {provider}")
+
+
+if st is not None:
+    @st.cache_resource(show_spinner=False)
+    def _cached_client(provider, base_url, key_hash, options_key, _api_key, _options):
+        return _build(provider, _api_key, base_url, _options)
+
+
+def get_client(provider, api_key, base_url=None, **options):
+    """
+    Shared client for (provider, base_url, API key, options). Providers: 'openai'
+    (OpenAI-compatible, GitHub Models by default), 'gemini', 'pinecone',
+    'pinecone_index' (name=...), 'embeddings' (model=...).
+    """
+    key_hash = api_key_hash(api_key)
+    options_key = tuple(sorted(options.items()))
+    if st is not None and st_runtime.exists():
+        before = _metrics.get(provider, {}).get('built', 0)
+        client = _cached_client(provider, base_url, key_hash, options_key, api_key, options)
+        if _metrics.get(provider, {}).get('built', 0) == before:
+            _count(provider, 'reused')
+        return client
+    key = (provider, base_url, key_hash, options_key)
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        _count(provider, 'reused')
+        return client
+    client = _build(provider, api_key, base_url, options)
+    with _lock:
+        return _clients.setdefault(key, client)
+
+
+def warm_up(openai_api_key=None, gemini_api_key=None, pinecone_api_key=None, pinecone_index=None):
+    """Builds the clients a session will use up front so the first request does not pay for construction."""
+    if openai_api_key:
+        get_client('openai', openai_api_key)
+        get_client('embeddings', openai_api_key, model=EMBEDDING_MODEL)
+    if gemini_api_key:
+        get_client('gemini', gemini_api_key)
+    if pinecone_api_key and pinecone_index:
+        get_client('pinecone_index', pinecone_api_key, name=pinecone_index)
+
+
+def client_metrics():
+    """{provider: {'built': n, 'reused': n}}; reused / (built + reused) is the client reuse rate."""
+    with _lock:
+        return {provider: dict(stats) for provider, stats in _metrics.items()}
@@ -0,0 +1,87 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from utils.cache_dir import cache_path, open_sqlite, process_wide, text_digest
+
+
+def normalize_query(text):
+    """Case- and whitespace-insensitive form of a query, so repeated purposes/personas share one entry."""
+    return re.sub(r'\s+', ' ', text or '').strip().casefold()
+
+
+class EmbeddingCache:
+    """
+    Query embeddings keyed by (model, normalized text): an in-memory LRU of
+    `max_entries` vectors in front of a SQLite table of float32 blobs (12 KB for
+    a 3072-dim vector). Shared by the email writer and both email RAG apps.
+    """
+
+    def __init__(self, path=None, max_entries=1024):
+        self.path = path or cache_path('query_embeddings.sqlite3')
+        self.max_entries = max_entries
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(self.path, """
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )""")
+
+    @staticmethod
+    def make_key(model, text):
+        return text_digest(f"{model}\x1f{normalize_query(text)}")
+
+    def _remember(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get(self, model, text):
+        key = self.make_key(model, text)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+            row = self._conn.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+
+    def put(self, model, text, vector):
+        key = self.make_key(model, text)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            self._conn.execute("INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?)",
+                               (key, vector.tobytes(), time.time()))
+        return vector
+
+    def embed_query(self, model, text, embed):
+        """Cached embed(text) for `model`, returned as a list of floats like OpenAIEmbeddings.embed_query."""
+        vector = self.get(model, text)
+        if vector is None:
+            vector = self.put(model, text, embed(text))
+        return vector.tolist()
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {'memory_hits': self.memory_hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'hit_rate': round(hits / total, 3) if total else 0.0}
+
+
+@process_wide
+def get_embedding_cache():
+    """Process-wide EmbeddingCache, opened on first use."""
+    return EmbeddingCache()
@@ -0,0 +1,68 @@
+import threading
+import time
+from utils.clients import get_client, api_key_hash
+
+
+class IndexStatsMonitor:
+    """
+    Keeps a Pinecone index's describe_index_stats() result fresh from a daemon
+    thread (once at start, then every `interval` seconds), so request handlers
+    never pay for the round trip and health checks read the last snapshot.
+    """
+
+    def __init__(self, pinecone_api_key, index_name, interval=300):
+        self.index_name = index_name
+        self.interval = interval
+        self._index = get_client('pinecone_index', pinecone_api_key, name=index_name)
+        self._stop = threading.Event()
+        self.stats = None
+        self.refreshed_at = None
+        self.error = None
+        self.refreshes = 0
+        self._thread = threading.Thread(target=self._run, name=f"index-stats-{index_name}", daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        try:
+            stats = self._index.describe_index_stats()
+            self.stats = stats.to_dict() if hasattr(stats, 'to_dict') else dict(stats)
+            self.refreshed_at = time.time()
+            self.error = None
+            self.refreshes += 1
+        except Exception as e:
+            self.error = str(e)
+            print(f"????ERROR???? in describe_index_stats for {self.index_name}:", e)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def health(self):
+        """Snapshot for a status panel: ok flag, vector counts per namespace, age of the data and last error."""
+        stats = self.stats or {}
+        return {
+            'index': self.index_name,
+            'ok': self.stats is not None and self.error is None,
+            'total_vector_count': stats.get('total_vector_count'),
+            'namespaces': {name: ns.get('vector_count') for name, ns in (stats.get('namespaces') or {}).items()},
+            'age_seconds': round(time.time() - self.refreshed_at) if self.refreshed_at else None,
+            'refreshes': self.refreshes,
+            'error': self.error,
+        }
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_index_monitor(pinecone_api_key, index_name='email', interval=300):
+    """Process-wide monitor per (API key, index); the first call starts its background refresh."""
+    key = (api_key_hash(pinecone_api_key), index_name)
+    with _monitors_lock:
+        if key not in _monitors:
+            _monitors[key] = IndexStatsMonitor(pinecone_api_key, index_name, interval)
+        return _monitors[key]
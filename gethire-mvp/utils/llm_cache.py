@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from utils.cache_dir import cache_path, open_sqlite, process_wide, text_digest
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of parsed LLM responses keyed by (template version, model,
+    temperature, max tokens, resume digest, digest of any other prompt inputs).
+    Holds at most `max_entries` responses; the least recently used are evicted
+    on insert. Entries can be dropped per resume, template or model.
+    """
+
+    def __init__(self, path=None, max_entries=2000):
+        self.path = path or cache_path('llm_responses.sqlite3')
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(self.path, """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                template TEXT NOT NULL,
+                model TEXT NOT NULL,
+                resume_digest TEXT NOT NULL,
+                response TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )""", "CREATE INDEX IF NOT EXISTS llm_responses_last_used ON llm_responses (last_used)")
+
+    @staticmethod
+    def make_key(template, model, temperature, max_tokens, resume_digest, inputs=''):
+        return text_digest('|'.join([template, model or '', f"{temperature:g}", str(max_tokens), resume_digest,
+                                     text_digest(inputs)]))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, response, template, model, resume_digest):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, template, model or '', resume_digest, json.dumps(response), time.time()))
+            self._conn.execute("""
+                DELETE FROM llm_responses WHERE key IN (
+                    SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)""", (self.max_entries,))
+
+    def cached_call(self, template, model, temperature, max_tokens, resume_digest, call, inputs=''):
+        """call() -> JSON-serializable response, made only when no entry exists for these parameters."""
+        key = self.make_key(template, model, temperature, max_tokens, resume_digest, inputs)
+        response = self.get(key)
+        if response is None:
+            response = call()
+            self.put(key, response, template, model, resume_digest)
+        return response
+
+    def invalidate(self, resume_digest=None, template=None, model=None):
+        """Deletes entries matching every given field (all entries if none given); returns how many."""
+        filters = {'resume_digest': resume_digest, 'template': template, 'model': model}
+        where = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM llm_responses" + (" WHERE " + " AND ".join(where) if where else ""),
+                [value for value in filters.values() if value is not None]).rowcount
+
+    def stats(self):
+        with self._lock:
+            entries, = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()
+        total = self.hits + self.misses
+        return {'entries': entries, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0}
+
+
+@process_wide
+def get_llm_cache():
+    """Process-wide LLMResponseCache, opened on first use."""
+    return LLMResponseCache()
@@ -0,0 +1,179 @@
+"""
+Shared rate limiting and retry for every LLM / embedding call in the app.
+
+Each (provider, model) gets one process-wide AdaptiveLimiter holding a
+requests-per-minute bucket, a tokens-per-minute bucket and a concurrency cap.
+call_llm() runs a provider call through the limiter and retries rate-limit and
+transient server errors with jittered exponential backoff, honoring the
+provider's Retry-After when it sends one. On a 429 the request rate is halved
+and then recovers additively on successes, so a search settles near the real
+quota instead of a hard-coded guess.
+"""
+import random
+import threading
+import time
+from utils.rate_limit import TokenBucket
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ProviderLimits:
+    """Quota for one provider/model: requests and tokens per minute (None = unlimited) and max in-flight calls."""
+
+    def __init__(self, rpm=None, tpm=None, concurrency=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.concurrency = concurrency
+
+    def __repr__(self):
+        return f"ProviderLimits(rpm={self.rpm}, tpm={self.tpm}, concurrency={self.concurrency})"
+
+
+# Free-tier quotas of the models offered in the sidebar; (provider, None) is the provider default.
+# Override with configure_limits() when running on a paid tier.
+DEFAULT_LIMITS = {
+    ('gemini', None): ProviderLimits(rpm=15, tpm=1_000_000, concurrency=8),
+    ('gemini', 'gemini-2.0-flash-lite'): ProviderLimits(rpm=30, tpm=1_000_000, concurrency=8),
+    ('gemini', 'gemini-2.0-flash'): ProviderLimits(rpm=15, tpm=1_000_000, concurrency=8),
+    ('github', None): ProviderLimits(rpm=15, concurrency=5),
+    ('github', 'openai/gpt-4o'): ProviderLimits(rpm=10, concurrency=2),
+    ('github', 'openai/gpt-4o-mini'): ProviderLimits(rpm=15, concurrency=5),
+    ('embeddings', None): ProviderLimits(rpm=15, concurrency=5),
+}
+
+
+class AdaptiveLimiter:
+    """
+    Requests/tokens per minute buckets plus a concurrency semaphore. The request
+    rate backs off multiplicatively on 429s (never below `floor` of the quota)
+    and grows back additively after `recover_after` consecutive successes.
+    """
+
+    def __init__(self, limits, floor=0.1, recover_after=5):
+        self.limits = limits
+        self.max_rate = limits.rpm / 60 if limits.rpm else None
+        self.floor = floor
+        self.recover_after = recover_after
+        self.requests = TokenBucket(self.max_rate, max(1, (limits.rpm or 1) // 6))
+        self.tokens = TokenBucket(limits.tpm / 60 if limits.tpm else None, limits.tpm or 1)
+        self.slots = threading.BoundedSemaphore(limits.concurrency) if limits.concurrency else None
+        self.lock = threading.Lock()
+        self.blocked_until = 0.0
+        self.successes = 0
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'failed': 0}
+
+    def acquire(self, tokens=0):
+        wait = self.blocked_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.requests.acquire()
+        if tokens:
+            self.tokens.acquire(min(tokens, self.tokens.capacity))
+
+    def on_success(self):
+        with self.lock:
+            self.stats['calls'] += 1
+            self.successes += 1
+            if self.max_rate and self.successes >= self.recover_after and self.requests.rate < self.max_rate:
+                self.requests.rate = min(self.max_rate, self.requests.rate + self.max_rate * 0.1)
+                self.successes = 0
+
+    def on_rate_limited(self, retry_after=None):
+        with self.lock:
+            self.stats['rate_limited'] += 1
+            self.successes = 0
+            if self.max_rate:
+                self.requests.rate = max(self.max_rate * self.floor, self.requests.rate / 2)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_limits(provider, model=None, **limits):
+    """Sets the quota for a provider (or one of its models), replacing any limiter already built for it."""
+    with _limiters_lock:
+        DEFAULT_LIMITS[(provider, model)] = ProviderLimits(**limits)
+        for key in [k for k in _limiters if k[0] == provider and (model is None or k[1] == model)]:
+            del _limiters[key]
+
+
+def get_limiter(provider, model=None):
+    """Process-wide AdaptiveLimiter for (provider, model), shared by every caller in the process."""
+    with _limiters_lock:
+        key = (provider, model)
+        if key not in _limiters:
+            limits = DEFAULT_LIMITS.get(key) or DEFAULT_LIMITS.get((provider, None)) or ProviderLimits()
+            _limiters[key] = AdaptiveLimiter(limits)
+        return _limiters[key]
+
+
+def limiter_stats():
+    with _limiters_lock:
+        return {f"{provider}:{model}": dict(limiter.stats, rpm=round((limiter.requests.rate or 0) * 60, 1))
+                for (provider, model), limiter in _limiters.items()}
+
+
+def _status_code(error):
+    for attr in ('status_code', 'code', 'status'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # No HTTP status: connection resets and timeouts from httpx / the SDKs
+    name = type(error).__name__.lower()
+    return 'timeout' in name or 'connection' in name
+
+
+def call_llm(provider, model, fn, /, *args, tokens=0, max_retries=5, base_delay=1.0, max_delay=60.0, **kwargs):
+    """
+    Calls fn(*args, **kwargs) under the (provider, model) limiter. `tokens` is the
+    estimated prompt + output size charged to the tokens-per-minute bucket.
+    Retryable errors are retried up to max_retries times with full-jitter
+    exponential backoff (or the server's Retry-After); the last error is raised.
+    provider/model/fn are positional-only so SDK keyword arguments like model= pass through.
+    """
+    limiter = get_limiter(provider, model)
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        if limiter.slots:
+            limiter.slots.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                with limiter.lock:
+                    limiter.stats['failed'] += 1
+                raise
+            retry_after = _retry_after(e)
+            if _status_code(e) == 429:
+                limiter.on_rate_limited(retry_after)
+            delay = retry_after or random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            with limiter.lock:
+                limiter.stats['retries'] += 1
+            print(f"????ERROR???? {provider} {model} call failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+        else:
+            limiter.on_success()
+            return result
+        finally:
+            if limiter.slots:
+                limiter.slots.release()
+        time.sleep(delay)
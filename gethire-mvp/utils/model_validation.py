@@ -2,9 +2,9 @@ import time
 import sys
 import os
 from dotenv import load_dotenv, find_dotenv
-from google import genai
 from google.genai import types
-from openai import OpenAI
+from utils.llm_limits import call_llm
+from utils.clients import get_client
 
 load_dotenv()
 
@@ -12,18 +12,20 @@ load_dotenv()
 #GITHUB_API_KEY = os.environ.get("GITHUB_API_KEY")#st.secrets["GITHUB_API_KEY"]
 
 def gemini_api_validation(API_KEY, model_name, user_prompt):
-    client = genai.Client(api_key=API_KEY)
+    client = get_client('gemini', API_KEY)
 
-    gemini_response = client.models.generate_content(
-        model=model_name, contents=user_prompt
+    gemini_response = call_llm(
+        'gemini', model_name, client.models.generate_content,
+        model=model_name, contents=user_prompt, max_retries=2
     )
     return gemini_response.text
 
 
 def openai_api_validation(API_KEY, model_name, user_prompt):
-    client= OpenAI(base_url="https://models.github.ai/inference", api_key=API_KEY)
+    client = get_client('openai', API_KEY)
     
-    openai_response = client.chat.completions.create(
+    openai_response = call_llm(
+    'github', model_name, client.chat.completions.create, max_retries=2,
     model=model_name,
     messages=[
                 {"role": "user", "content": user_prompt}
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of up to `capacity` calls and
+    refills at `rate` tokens per second. rate=None disables limiting.
+    Callers that overdraw the bucket queue behind each other instead of spinning.
+    """
+
+    def __init__(self, rate=None, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """Takes `amount` tokens and returns how many seconds the caller must wait."""
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, amount=1):
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, amount=1):
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,189 @@
+"""
+Content-addressed store for uploaded resumes and everything derived from them.
+
+Each resume is keyed by the SHA-256 of its bytes, so the same file uploaded
+again, or opened from another page (Job Search, Email Writer, Resume Enhancer),
+reuses what was already computed for it:
+
+- the file bytes and name, and a temp copy on disk for code that needs a path
+  (removed once unused for RESUME_FILE_TTL)
+- the extracted text and its token count, extracted on first use
+- embeddings, one per embedding model
+- Gemini Files API handles per API key, in memory, for RESUME_UPLOAD_TTL
+
+LLM responses derived from a resume (e.g. the skills summary) are cached by
+the same digest in utils/llm_cache.py.
+
+A resume not added again for RESUME_TTL is deleted with its text and
+embeddings on the next add(), and at most `max_resumes` are kept (least
+recently used evicted first), so uploads are not held indefinitely.
+"""
+import os
+import threading
+import time
+import numpy as np
+from utils.cache_dir import cache_path, open_sqlite, process_wide, text_digest
+from utils.clients import api_key_hash
+from utils.doc_extract import extract, detect_mime
+
+RESUME_TTL = 24 * 3600
+RESUME_FILE_TTL = 3600
+RESUME_UPLOAD_TTL = 46 * 3600  # Gemini Files API deletes uploads after 48 hours
+
+
+class ResumeStore:
+    def __init__(self, path=None, files_dir=None, max_resumes=200, ttl=RESUME_TTL, file_ttl=RESUME_FILE_TTL):
+        self.path = path or cache_path('resume_store.sqlite3')
+        self.files_dir = files_dir or cache_path('resume_files')
+        os.makedirs(self.files_dir, exist_ok=True)
+        self.max_resumes = max_resumes
+        self.ttl = ttl
+        self.file_ttl = file_ttl
+        self.hits = self.misses = 0
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._conn = open_sqlite(self.path, """
+            CREATE TABLE IF NOT EXISTS resumes (
+                digest TEXT PRIMARY KEY,
+                name TEXT,
+                data BLOB NOT NULL,
+                text TEXT,
+                tokens INTEGER,
+                last_used REAL NOT NULL
+            )""", """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                digest TEXT NOT NULL,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (digest, model)
+            )""")
+        self._conn.execute("PRAGMA secure_delete=ON")  # evicted resume bytes are overwritten, not left in free pages
+
+    def add(self, data, name=None):
+        """Registers resume bytes (no-op if already stored) and returns their digest."""
+        digest = text_digest(data)
+        with self._lock:
+            self._evict()
+            updated = self._conn.execute("UPDATE resumes SET last_used = ? WHERE digest = ?",
+                                         (time.time(), digest)).rowcount
+            if updated:
+                self.hits += 1
+                return digest
+            self.misses += 1
+            self._conn.execute("INSERT INTO resumes (digest, name, data, last_used) VALUES (?, ?, ?, ?)",
+                               (digest, name, data, time.time()))
+            self._evict()
+        return digest
+
+    def add_upload(self, uploaded_file):
+        """add() for a Streamlit UploadedFile (read without moving its cursor)."""
+        return self.add(uploaded_file.getvalue(), uploaded_file.name)
+
+    def add_file(self, path):
+        with open(path, 'rb') as f:
+            return self.add(f.read(), os.path.basename(path))
+
+    def _evict(self):
+        """Deletes resumes unused for `ttl` seconds or beyond the `max_resumes` most recent, with their embeddings."""
+        stale = {row[0] for row in self._conn.execute(
+            "SELECT digest FROM resumes WHERE last_used < ? OR digest IN "
+            "(SELECT digest FROM resumes ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (time.time() - self.ttl, self.max_resumes))}
+        for digest in stale:
+            self._conn.execute("DELETE FROM resumes WHERE digest = ?", (digest,))
+        # Also embeddings stored for a digest after its resume was deleted
+        self._conn.execute("DELETE FROM embeddings WHERE digest NOT IN (SELECT digest FROM resumes)")
+        self._uploads = {k: v for k, v in self._uploads.items() if k[1] not in stale}
+
+    def __contains__(self, digest):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM resumes WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def _row(self, digest, columns):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {columns} FROM resumes WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"resume {digest} is not in the store")
+        return row
+
+    def text(self, digest):
+        """Extracted text of a stored resume (PDF, DOCX, TXT/Markdown); extracted and token-counted on first call."""
+        name, text = self._row(digest, "name, text")
+        if text is not None:
+            return text
+        result = extract(self._row(digest, "data")[0], name=name)
+        with self._lock:
+            self._conn.execute("UPDATE resumes SET text = ?, tokens = ? WHERE digest = ?",
+                               (result.text, result.tokens, digest))
+        return result.text
+
+    def mime(self, digest):
+        data, name = self._row(digest, "data, name")
+        return detect_mime(data, name)
+
+    def tokens(self, digest):
+        self.text(digest)
+        return self._row(digest, "tokens")[0]
+
+    def file_path(self, digest):
+        """
+        Path of an on-disk copy of the resume, named by digest so repeated searches
+        share one file. Copies unused for file_ttl seconds are deleted on each call.
+        """
+        name, = self._row(digest, "name")
+        path = os.path.join(self.files_dir, digest + (os.path.splitext(name or '')[1].lower() or '.pdf'))
+        self.sweep_files(keep=path)
+        if not os.path.exists(path):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(self._row(digest, "data")[0])
+            os.replace(tmp, path)
+        os.utime(path)
+        return path
+
+    def sweep_files(self, keep=None):
+        cutoff = time.time() - self.file_ttl
+        for entry in os.scandir(self.files_dir):
+            try:
+                if entry.path != keep and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass  # removed by another session, or still open on Windows
+
+    def embedding(self, digest, model, embed=None, text=None):
+        """Stored embedding of the resume text for `model`; computed with embed([text]) when missing."""
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE digest = ? AND model = ?",
+                                     (digest, model)).fetchone()
+        if row is not None:
+            return np.frombuffer(row[0], dtype=np.float32)
+        text = text or (self.text(digest) if digest in self else None)
+        if embed is None or not text:
+            return None
+        vector = np.asarray(embed([text])[0], dtype=np.float32)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", (digest, model, vector.tobytes()))
+        return vector
+
+    def gemini_file(self, digest, api_key, upload):
+        """Gemini Files API handle for the resume under api_key; upload(path) runs at most once per TTL."""
+        key = (api_key_hash(api_key), digest)
+        with self._lock:
+            cached = self._uploads.get(key)
+            if cached and time.time() - cached[1] < RESUME_UPLOAD_TTL:
+                return cached[0]
+        uploaded_file = upload(self.file_path(digest))
+        with self._lock:
+            self._uploads[key] = (uploaded_file, time.time())
+        return uploaded_file
+
+    def stats(self):
+        with self._lock:
+            resumes, = self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()
+        return {'resumes': resumes, 'hits': self.hits, 'misses': self.misses, 'gemini_uploads': len(self._uploads)}
+
+
+@process_wide
+def get_resume_store():
+    """Process-wide ResumeStore, opened on first use."""
+    return ResumeStore()
@@ -0,0 +1,74 @@
+"""
+Token accounting shared by every module: tiktoken encoders are loaded once per
+process and reused. When an encoding cannot be loaded (e.g. tiktoken has no
+network to fetch it), counts fall back to a ~4 chars/token estimate.
+"""
+import threading
+import tiktoken
+
+DEFAULT_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(encoding_name=DEFAULT_ENCODING):
+    """Cached tiktoken Encoding, or None if it could not be loaded (the failure is cached too)."""
+    enc = _encoders.get(encoding_name, False)
+    if enc is not False:
+        return enc
+    with _encoders_lock:
+        if encoding_name not in _encoders:
+            try:
+                _encoders[encoding_name] = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                print(f"????ERROR???? loading tiktoken encoding {encoding_name}, estimating token counts:", e)
+                _encoders[encoding_name] = None
+        return _encoders[encoding_name]
+
+
+def _rough_count(text):
+    return len(text) // CHARS_PER_TOKEN + (1 if text else 0)
+
+
+def count_tokens(text, encoding_name=DEFAULT_ENCODING):
+    if not text:
+        return 0
+    enc = get_encoder(encoding_name)
+    return len(enc.encode_ordinary(text)) if enc else _rough_count(text)
+
+
+def count_tokens_batch(texts, encoding_name=DEFAULT_ENCODING, num_threads=8):
+    """Token counts for many strings in one call (tiktoken encodes the batch across threads)."""
+    enc = get_encoder(encoding_name)
+    if enc is None:
+        return [_rough_count(t or '') for t in texts]
+    return [len(tokens) for tokens in enc.encode_ordinary_batch([t or '' for t in texts], num_threads=num_threads)]
+
+
+def estimate_tokens(text, budget=None, encoding_name=DEFAULT_ENCODING):
+    """
+    Token count for quota and budget checks. With a budget, counting stops as soon
+    as the budget is exceeded and some value > budget is returned, so a huge
+    text costs about `budget` tokens of encoding rather than its full length.
+    """
+    if not text:
+        return 0
+    if budget is None:
+        return count_tokens(text, encoding_name)
+    if len(text) <= budget:
+        return count_tokens(text, encoding_name)
+    enc = get_encoder(encoding_name)
+    if enc is None:
+        return _rough_count(text)
+    total, start = 0, 0
+    while start < len(text) and total <= budget:
+        # Slice ~enough characters for the remaining budget, ending on whitespace so words are not split
+        end = min(len(text), start + (budget - total + 1) * CHARS_PER_TOKEN)
+        if end < len(text):
+            space = text.rfind(' ', start, end)
+            end = space + 1 if space > start else end
+        total += len(enc.encode_ordinary(text[start:end]))
+        start = end
+    return total
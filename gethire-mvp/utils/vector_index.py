@@ -0,0 +1,153 @@
+"""
+Local, in-process replacement for the Pinecone email guide index.
+
+Each namespace is a directory holding a float32 matrix (vectors.f32, opened as a
+read-only memmap), the matching ids/metadata (meta.json) and info.json
+(dim, metric, embedding model). query() takes the same arguments and returns the
+same {'matches': [{'id', 'score', 'metadata'}]} shape as pinecone's
+Index.query, so knowledge_retrieval works against either backend.
+
+Search is exact (one matrix-vector product); for namespaces above
+HNSW_MIN_VECTORS an hnswlib graph is built on load when hnswlib is installed.
+
+Export the current Pinecone namespace once with:
+
+    python -m utils.vector_index export --index email --namespace email_guide
+"""
+import json
+import os
+import threading
+import numpy as np
+from utils.cache_dir import cache_path, process_wide
+
+try:
+    import hnswlib
+except ImportError:  # optional; exact search is used instead
+    hnswlib = None
+
+HNSW_MIN_VECTORS = 20000
+EMAIL_GUIDE_INDEX_DIR = os.environ.get('EMAIL_GUIDE_INDEX_DIR') or cache_path('email_guide_index')
+# 'pinecone' (default) or 'local'
+EMAIL_RETRIEVAL_BACKEND = os.environ.get('EMAIL_RETRIEVAL_BACKEND', 'pinecone')
+
+
+def write_namespace(directory, ids, vectors, metadatas, metric='euclidean', model="text-embedding-3-large"):
+    """Writes one namespace (ids, float32 vectors, metadata dicts) in the layout LocalVectorIndex reads."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    os.makedirs(directory, exist_ok=True)
+    vectors.tofile(os.path.join(directory, 'vectors.f32'))
+    with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump([{'id': i, 'metadata': m} for i, m in zip(ids, metadatas)], f)
+    with open(os.path.join(directory, 'info.json'), 'w', encoding='utf-8') as f:
+        json.dump({'dim': int(vectors.shape[1]) if len(vectors) else 0, 'count': len(vectors),
+                   'metric': metric, 'model': model}, f)
+
+
+class _Namespace:
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'info.json'), encoding='utf-8') as f:
+            self.info = json.load(f)
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            entries = json.load(f)
+        self.ids = [e['id'] for e in entries]
+        self.metadata = [e['metadata'] for e in entries]
+        count, dim = self.info['count'], self.info['dim']
+        self.vectors = np.memmap(os.path.join(directory, 'vectors.f32'), dtype=np.float32, mode='r',
+                                 shape=(count, dim)) if count else np.zeros((0, dim), dtype=np.float32)
+        self.sq_norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+        self.hnsw = None
+        if hnswlib is not None and count >= HNSW_MIN_VECTORS:
+            space = 'l2' if self.info['metric'] == 'euclidean' else 'ip' if self.info['metric'] == 'dotproduct' else 'cosine'
+            self.hnsw = hnswlib.Index(space=space, dim=dim)
+            self.hnsw.init_index(max_elements=count, ef_construction=200, M=16)
+            self.hnsw.add_items(np.asarray(self.vectors), np.arange(count))
+            self.hnsw.set_ef(64)
+
+    def search(self, vector, top_k):
+        """Returns (row indices, scores) best first, scored like Pinecone for the namespace's metric."""
+        vector = np.asarray(vector, dtype=np.float32)
+        top_k = min(top_k, len(self.ids))
+        metric = self.info['metric']
+        if top_k == 0:
+            return [], []
+        if self.hnsw is not None:
+            rows, distances = self.hnsw.knn_query(vector, k=top_k)
+            rows, distances = rows[0], distances[0]
+            scores = distances if metric == 'euclidean' else 1 - distances
+            return rows.tolist(), scores.tolist()
+        dots = self.vectors @ vector
+        if metric == 'euclidean':
+            scores = self.sq_norms - 2 * dots + vector @ vector  # squared L2, lower is closer
+            order = np.argpartition(scores, top_k - 1)[:top_k]
+            order = order[np.argsort(scores[order])]
+        else:
+            scores = dots if metric == 'dotproduct' else dots / (np.sqrt(self.sq_norms) * np.linalg.norm(vector) + 1e-12)
+            order = np.argpartition(-scores, top_k - 1)[:top_k]
+            order = order[np.argsort(-scores[order])]
+        return order.tolist(), scores[order].tolist()
+
+
+class LocalVectorIndex:
+    """Pinecone-Index-shaped view over namespace directories under `root`, each loaded once on first use."""
+
+    def __init__(self, root=EMAIL_GUIDE_INDEX_DIR):
+        self.root = root
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace):
+        with self._lock:
+            if namespace not in self._namespaces:
+                self._namespaces[namespace] = _Namespace(os.path.join(self.root, namespace or '__default__'))
+            return self._namespaces[namespace]
+
+    def query(self, vector, top_k=10, namespace=None, include_metadata=False, **kwargs):
+        ns = self._namespace(namespace)
+        rows, scores = ns.search(vector, top_k)
+        return {'namespace': namespace, 'matches': [
+            {'id': ns.ids[row], 'score': float(score), **({'metadata': ns.metadata[row]} if include_metadata else {})}
+            for row, score in zip(rows, scores)
+        ]}
+
+    def describe_index_stats(self):
+        namespaces = {}
+        for name in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []:
+            info_path = os.path.join(self.root, name, 'info.json')
+            if os.path.exists(info_path):
+                with open(info_path, encoding='utf-8') as f:
+                    namespaces[name] = {'vector_count': json.load(f)['count']}
+        return {'namespaces': namespaces, 'total_vector_count': sum(n['vector_count'] for n in namespaces.values())}
+
+
+@process_wide
+def get_local_index(root=EMAIL_GUIDE_INDEX_DIR):
+    """Process-wide LocalVectorIndex per directory."""
+    return LocalVectorIndex(root)
+
+
+def export_pinecone_namespace(index, namespace, directory, metric='euclidean', batch=100):
+    """Copies every vector and its metadata from a pinecone Index namespace into `directory`."""
+    ids = [vid for page in index.list(namespace=namespace) for vid in page]
+    vectors, metadatas = [], []
+    for i in range(0, len(ids), batch):
+        fetched = index.fetch(ids=ids[i:i + batch], namespace=namespace).vectors
+        for vid in ids[i:i + batch]:
+            vectors.append(fetched[vid].values)
+            metadatas.append(dict(fetched[vid].metadata or {}))
+    write_namespace(directory, ids, vectors, metadatas, metric=metric)
+    return len(ids)
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.clients import get_client
+    parser = argparse.ArgumentParser(description="Export a Pinecone namespace to the local vector index")
+    parser.add_argument('command', choices=['export'])
+    parser.add_argument('--index', default='email')
+    parser.add_argument('--namespace', default='email_guide')
+    parser.add_argument('--out', default=EMAIL_GUIDE_INDEX_DIR)
+    parser.add_argument('--metric', default='euclidean', help="the Pinecone index metric")
+    args = parser.parse_args()
+    pinecone_index = get_client('pinecone_index', os.environ.get("PINECONE_API_KEY"), name=args.index)
+    count = export_pinecone_namespace(pinecone_index, args.namespace, os.path.join(args.out, args.namespace), args.metric)
+    print(f"Exported {count} vectors to {os.path.join(args.out, args.namespace)}")
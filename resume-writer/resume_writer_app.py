@@ -2,7 +2,6 @@ import os
 from dotenv import load_dotenv, find_dotenv
 import time
 import json
-import tiktoken
 from PyPDF2 import PdfReader
 import streamlit as st
 from openai import OpenAI
@@ -24,11 +23,6 @@ def extract_text_from_pdf(file_path):
     return text.strip()
 
 
-def count_tokens(text, encoding_name="o200k_base"):
-    enc = tiktoken.get_encoding(encoding_name)
-    return len(enc.encode(text))
-
-
 def llm_call_openai(model_name, messages, max_tokens, output_format):
     response = client.beta.chat.completions.parse(
         messages=messages,